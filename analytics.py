@@ -0,0 +1,189 @@
+from bisect import bisect_left, insort
+from collections import Counter
+
+import pandas as pd
+
+GRADE_POINTS = {'A+': 4.0, 'A': 4.0, 'B+': 3.3, 'B': 3.0, 'C+': 2.3, 'C': 2.0, 'D': 1.0, 'F': 0.0}
+FAILING_GRADE = 'F'
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def gpa(grade_counts):
+    """Mean grade points over a Counter of grades (unknown grades are skipped), or None"""
+    graded = sum(count for grade, count in grade_counts.items() if grade in GRADE_POINTS)
+    if not graded:
+        return None
+    return sum(GRADE_POINTS[grade] * count for grade, count in grade_counts.items() if grade in GRADE_POINTS) / graded
+
+
+def pass_rate(grade_counts):
+    """Fraction of grades that are not failing, or None"""
+    total = sum(grade_counts.values())
+    return (total - grade_counts.get(FAILING_GRADE, 0)) / total if total else None
+
+
+def _tally(index, key, value, delta):
+    counts = index.get(key)
+    if counts is None:
+        index[key] = counts = Counter()
+    counts[value] += delta
+    if counts[value] <= 0:
+        del counts[value]
+    if not counts:
+        del index[key]
+
+
+class GradeAggregates:
+    """Grade statistics over the verified rows, maintained from appended blocks.
+
+    Grade counts are kept overall and per student, subject and semester, and
+    student GPAs in a sorted list for class-wide percentiles, so each INSERT
+    or DELETE block only touches the tallies of the rows it changes. Like
+    BlockIndex, blocks are only applied in order; catch_up() applies the
+    rest, and from_frame() rebuilds everything from a table of rows at once.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.overall = Counter()
+        self.by_student = {}
+        self.by_subject = {}
+        self.by_semester = {}
+        self.student_subjects = {}
+        self._rows = {}  # sql_id -> (student_id, subject, semester, grade) of verified rows
+        self._gpa = {}  # student_id -> GPA
+        self._gpas = []  # every student's GPA, sorted
+        self.position = 0
+        self._last_hash = None
+
+    def add(self, block):
+        """Apply one block; ignored unless it is the next position"""
+        pos = block['index']
+        if pos != self.position:
+            return
+
+        sql_operation = block.get('sql_operation') or ''
+        data = block['data']
+        if sql_operation.startswith('BULK_INSERT'):
+            for record in data.get('records', []):
+                self._insert(record)
+        elif sql_operation.startswith('INSERT'):
+            self._insert(data)
+        elif sql_operation.startswith('DELETE'):
+            self._delete(data.get('sql_id'))
+
+        self.position = pos + 1
+        self._last_hash = block['hash']
+
+    def _insert(self, record):
+        row = (str(record.get('student_id')), str(record.get('subject')),
+               str(record.get('semester') or ''), str(record.get('grade')))
+        self._rows[record['sql_id']] = row
+        self._count(row, 1)
+
+    def _delete(self, sql_id):
+        row = self._rows.pop(sql_id, None)
+        if row is not None:
+            self._count(row, -1)
+
+    def _count(self, row, delta):
+        student_id, subject, semester, grade = row
+        self.overall[grade] += delta
+        if self.overall[grade] <= 0:
+            del self.overall[grade]
+        _tally(self.by_student, student_id, grade, delta)
+        _tally(self.by_subject, subject, grade, delta)
+        _tally(self.by_semester, semester, grade, delta)
+        _tally(self.student_subjects, student_id, subject, delta)
+        self._update_gpa(student_id)
+
+    def _update_gpa(self, student_id):
+        old = self._gpa.pop(student_id, None)
+        if old is not None:
+            del self._gpas[bisect_left(self._gpas, old)]
+        new = gpa(self.by_student.get(student_id, {}))
+        if new is not None:
+            self._gpa[student_id] = new
+            insort(self._gpas, new)
+
+    def catch_up(self, chain):
+        """Apply blocks not seen yet, starting over if the chain changed underneath"""
+        if self.position and (self.position > len(chain) or chain.hash_at(self.position - 1) != self._last_hash):
+            self.reset()
+        for pos in range(self.position, len(chain)):
+            self.add(chain[pos])
+
+    @classmethod
+    def from_frame(cls, df, position=0, last_hash=None):
+        """Aggregates of a DataFrame of verified rows, computed with vectorized group-bys.
+
+        df needs id, student_id, subject, semester and grade columns. position
+        and last_hash are the chain tip the rows correspond to, so add() and
+        catch_up() can continue from there.
+        """
+        aggregates = cls()
+        frame = pd.DataFrame({
+            'id': df['id'].astype('int64'),
+            'student_id': df['student_id'].astype(str),
+            'subject': df['subject'].astype(str),
+            'semester': df['semester'].fillna('').astype(str),
+            'grade': df['grade'].astype(str)
+        })
+
+        aggregates.overall = Counter({grade: int(count) for grade, count in frame['grade'].value_counts().items()})
+        for index, column, value in ((aggregates.by_student, 'student_id', 'grade'),
+                                     (aggregates.by_subject, 'subject', 'grade'),
+                                     (aggregates.by_semester, 'semester', 'grade'),
+                                     (aggregates.student_subjects, 'student_id', 'subject')):
+            for (key, item), count in frame.groupby([column, value]).size().items():
+                index.setdefault(key, Counter())[item] = int(count)
+
+        gpas = frame['grade'].map(GRADE_POINTS).groupby(frame['student_id']).mean().dropna()
+        aggregates._gpa = {student_id: float(value) for student_id, value in gpas.items()}
+        aggregates._gpas = sorted(aggregates._gpa.values())
+        aggregates._rows = dict(zip(frame['id'].tolist(), zip(frame['student_id'].tolist(), frame['subject'].tolist(),
+                                                              frame['semester'].tolist(), frame['grade'].tolist())))
+        aggregates.position = position
+        aggregates._last_hash = last_hash
+        return aggregates
+
+    def gpa_percentiles(self, percentiles=PERCENTILES):
+        """Class-wide percentiles of student GPAs (linear interpolation), or {} without grades"""
+        values = self._gpas
+        if not values:
+            return {}
+        result = {}
+        for percentile in percentiles:
+            rank = (len(values) - 1) * percentile / 100
+            low = int(rank)
+            high = min(low + 1, len(values) - 1)
+            result[percentile] = values[low] + (values[high] - values[low]) * (rank - low)
+        return result
+
+    def student_summary(self, student_id):
+        """GPA, pass rate and grade/subject counts of one student"""
+        grades = self.by_student.get(str(student_id), Counter())
+        return {
+            'rows': sum(grades.values()),
+            'gpa': self._gpa.get(str(student_id)),
+            'pass_rate': pass_rate(grades),
+            'most_common_grade': grades.most_common(1)[0][0] if grades else None,
+            'grade_counts': dict(grades.most_common()),
+            'subject_counts': dict(self.student_subjects.get(str(student_id), Counter()).most_common())
+        }
+
+    def summary(self):
+        """Class-wide aggregates for the analytics dashboard"""
+        return {
+            'rows': sum(self.overall.values()),
+            'students': len(self.by_student),
+            'gpa_percentiles': self.gpa_percentiles(),
+            'pass_rate': pass_rate(self.overall),
+            'grade_counts': dict(self.overall.most_common()),
+            'subject_counts': {subject: sum(grades.values()) for subject, grades in
+                               sorted(self.by_subject.items(), key=lambda item: -sum(item[1].values()))},
+            'subject_pass_rates': {subject: pass_rate(grades) for subject, grades in sorted(self.by_subject.items())},
+            'semester_grades': {semester: dict(grades) for semester, grades in sorted(self.by_semester.items())}
+        }
@@ -2,7 +2,12 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from blockchain_supabase import BlockchainSupabaseDB
+from blockchain_supabase import BlockchainSupabaseDB, SEARCH_LIMIT, GRID_PAGE_SIZE, GRADES, SEMESTERS
+from storage import GRID_SORT_COLUMNS
+from merkle import verify_inclusion_proof
+from metrics import REGISTRY
+from chain_export import read_export, verify_export
+from analytics import GradeAggregates
 from datetime import datetime
 import time
 
@@ -28,12 +33,81 @@ USERS_DB = {
 
 
 # 🔄 Initialize Database with Caching
-@st.cache_resource
+@st.cache_resource(show_spinner="⛓️ Loading blockchain...")
 def init_database():
     return BlockchainSupabaseDB()
 
 
+def show_chart(fig, chart):
+    """Render a Plotly figure, timing it for the Performance panel"""
+    with REGISTRY.timer("app_chart_render_seconds", chart=chart):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def grade_grid(db, key, columns=None):
+    """Paginated grade table; sorting, filtering and paging all run in the backend"""
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        sort = st.selectbox("Sort by", GRID_SORT_COLUMNS, key=f"{key}_sort")
+        descending = st.checkbox("Descending", key=f"{key}_desc")
+    with col2:
+        student_id = st.text_input("Student ID", key=f"{key}_student")
+    with col3:
+        subject = st.text_input("Subject", key=f"{key}_subject")
+    with col4:
+        grade = st.selectbox("Grade", ["All"] + GRADES, key=f"{key}_grade")
+    with col5:
+        semester = st.selectbox("Semester", ["All"] + SEMESTERS, key=f"{key}_semester")
+
+    filters = {
+        'student_id': student_id.strip(),
+        'subject': subject.strip(),
+        'grade': grade if grade != "All" else None,
+        'semester': semester if semester != "All" else None
+    }
+
+    # Cursor of every page visited so far; a new sort or filter starts over at page 1
+    view = (sort, descending, tuple(filters.items()))
+    if st.session_state.get(f"{key}_view") != view:
+        st.session_state[f"{key}_view"] = view
+        st.session_state[f"{key}_cursors"] = [None]
+    cursors = st.session_state[f"{key}_cursors"]
+
+    df, next_cursor = db.get_grades_page(sort, descending, cursors[-1], **filters)
+    total = db.count_grades(**filters)
+    if df.empty:
+        st.info("No grades found.")
+        return df
+
+    st.dataframe(df[columns] if columns else df, use_container_width=True, hide_index=True)
+    col1, col2, col3 = st.columns([1, 4, 1])
+    with col1:
+        st.button("◀ Previous", key=f"{key}_prev", disabled=len(cursors) == 1,
+                  on_click=cursors.pop, use_container_width=True)
+    with col2:
+        pages = max(1, -(-total // GRID_PAGE_SIZE))
+        st.caption(f"Page {len(cursors)} of {pages} · {total} matching grades")
+    with col3:
+        st.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None,
+                  on_click=cursors.append, args=(next_cursor,), use_container_width=True)
+    return df
+
+
 # 🔐 Authentication Functions
+def proof_status(db, row, proof):
+    """Whether proof shows this grade row, as displayed, in a block of db's chain"""
+    if not proof or not verify_inclusion_proof(proof):
+        return "❌ Not proven"
+    block = proof['block']
+    if not 0 <= block['index'] < len(db.chain) or db.chain.hash_at(block['index']) != block['hash']:
+        return "❌ Not on this chain"
+    record = proof['record']
+    shown = lambda value: '' if value is None or pd.isna(value) else str(value)
+    if any(shown(record.get(column)) != shown(row[column]) for column in ('student_id', 'subject', 'grade', 'semester')):
+        return "❌ Differs from the chain"
+    return "✅ Verified"
+
+
 def authenticate_user(username, password, role):
     """Authenticate user credentials"""
     if username in USERS_DB:
@@ -107,22 +181,20 @@ def student_dashboard(db):
     df = db.get_student_grades_by_id(student_id)
 
     if not df.empty:
-        # Student metrics
+        # Student metrics, precomputed as blocks are appended
+        summary = db.get_student_summary(student_id)
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("📊 Total Subjects", df['subject'].nunique())
+            st.metric("📊 Total Subjects", len(summary['subject_counts']))
         with col2:
-            avg_grade = df['grade'].mode().iloc[0] if not df.empty else "N/A"
-            st.metric("🏆 Most Common Grade", avg_grade)
+            st.metric("🏆 Most Common Grade", summary['most_common_grade'] or "N/A")
         with col3:
-            # Calculate GPA
-            grade_points = {'A+': 4.0, 'A': 4.0, 'B+': 3.3, 'B': 3.0, 'C+': 2.3, 'C': 2.0, 'D': 1.0, 'F': 0.0}
-            gpa = df['grade'].map(grade_points).mean()
-            st.metric("📈 GPA", f"{gpa:.2f}")
+            gpa = summary['gpa']
+            st.metric("📈 GPA", f"{gpa:.2f}" if gpa is not None else "N/A")
         with col4:
-            passing_rate = (df['grade'] != 'F').mean() * 100
-            st.metric("✅ Pass Rate", f"{passing_rate:.0f}%")
+            passing_rate = summary['pass_rate']
+            st.metric("✅ Pass Rate", f"{passing_rate * 100:.0f}%" if passing_rate is not None else "N/A")
 
         # Student's grade table
         st.subheader("📋 Your Grades")
@@ -134,24 +206,46 @@ def student_dashboard(db):
 
         with col1:
             # Grade distribution
-            grade_counts = df['grade'].value_counts()
+            grade_counts = summary['grade_counts']
             fig = px.bar(
-                x=grade_counts.index,
-                y=grade_counts.values,
+                x=list(grade_counts.keys()),
+                y=list(grade_counts.values()),
                 title="Your Grade Distribution",
                 labels={'x': 'Grade', 'y': 'Count'}
             )
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig, "student_grade_distribution")
 
         with col2:
             # Subject performance
-            subject_counts = df['subject'].value_counts()
+            subject_counts = summary['subject_counts']
             fig = px.pie(
-                values=subject_counts.values,
-                names=subject_counts.index,
+                values=list(subject_counts.values()),
+                names=list(subject_counts.keys()),
                 title="Subjects Taken"
             )
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig, "student_subjects")
+
+        # Blockchain proofs for the student's own records
+        st.subheader("🔐 Blockchain Proofs")
+        if st.button("🔍 Prove My Grades Are On-Chain"):
+            proof_rows = []
+            for _, row in df.iterrows():
+                proof = db.get_inclusion_proof(row['id'])
+                proof_rows.append({
+                    'id': row['id'],
+                    'subject': row['subject'],
+                    'grade': row['grade'],
+                    'block': proof['block']['index'] if proof else None,
+                    'proof_length': len(proof['proof']) if proof else None,
+                    'status': proof_status(db, row, proof)
+                })
+            st.dataframe(pd.DataFrame(proof_rows), use_container_width=True, hide_index=True)
+
+        # Every block that touched the student's records
+        st.subheader("📜 Grade History")
+        history_df = db.get_history(student_id=student_id)
+        if not history_df.empty:
+            st.dataframe(history_df.drop(columns=['student_id', 'block_hash']), use_container_width=True, hide_index=True)
 
     else:
         st.info("📝 No grades found. Please contact your teacher.")
@@ -166,11 +260,16 @@ def teacher_dashboard(db):
         "Choose Operation:",
         [
             "📝 Add Student Grade",
+            "📤 Bulk Import Grades",
             "📊 View All Grades",
             "🔍 Search Students",
             "🗑️ Delete Grade",
+            "📜 Grade History",
             "📈 Analytics Dashboard",
+            "📦 Export & Archive",
             "⛓️ Blockchain Stats",
+            "🕰️ Time Travel",
+            "📉 Performance",
             "🔄 Reset Database (Admin)"
         ]
     )
@@ -202,13 +301,44 @@ def teacher_dashboard(db):
                     else:
                         st.error(f"❌ Error: {res}")
 
+    elif operation == "📤 Bulk Import Grades":
+        st.subheader("📤 Bulk Import Grades")
+        st.caption("Columns: student_name, student_id, subject, grade, semester, remarks (optional)")
+
+        uploaded = st.file_uploader("Upload CSV or Excel file", type=["csv", "xlsx"])
+        if uploaded is not None:
+            if uploaded.name.endswith(".xlsx"):
+                import_df = pd.read_excel(uploaded, dtype=str)
+            else:
+                import_df = pd.read_csv(uploaded, dtype=str)
+
+            valid_df, rejected_df = db.validate_grade_rows(import_df)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("✅ Valid Rows", len(valid_df))
+            with col2:
+                st.metric("❌ Rejected Rows", len(rejected_df))
+
+            if not rejected_df.empty:
+                with st.expander("Rejected rows"):
+                    st.dataframe(rejected_df, use_container_width=True)
+
+            if not valid_df.empty and st.button("🚀 Import Grades", use_container_width=True):
+                progress_bar = st.progress(0.0, text="Importing...")
+                summary, error = db.add_student_grades_bulk(
+                    valid_df,
+                    progress=lambda done, total: progress_bar.progress(done / total, text=f"Chunk {done}/{total}")
+                )
+                if summary['skipped_chunks']:
+                    st.info(f"Resumed batch {summary['batch_id']}: {summary['skipped_chunks']} chunk(s) were already imported")
+                if error:
+                    st.error(f"❌ {error}. Upload the same file again to resume.")
+                else:
+                    st.success(f"✅ Imported {summary['imported']} grades in {len(summary['blocks'])} block(s)")
+
     elif operation == "📊 View All Grades":
         st.subheader("📊 All Student Grades")
-        df = db.get_all_grades_sql()
-        if not df.empty:
-            st.dataframe(df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No grades found.")
+        grade_grid(db, "view_grid")
 
     elif operation == "🔍 Search Students":
         st.subheader("🔍 Search Students")
@@ -216,20 +346,32 @@ def teacher_dashboard(db):
         if search_term:
             df = db.search_students_sql(search_term)
             if not df.empty:
+                if len(df) >= SEARCH_LIMIT:
+                    st.caption(f"Showing the first {SEARCH_LIMIT} matches; refine your search to narrow it down.")
                 st.dataframe(df, use_container_width=True, hide_index=True)
             else:
                 st.warning("No results found.")
 
     elif operation == "🗑️ Delete Grade":
         st.subheader("🗑️ Delete Student Grade")
-        df = db.get_all_grades_sql()
-        if not df.empty:
-            st.dataframe(df[['id', 'student_name', 'student_id', 'subject', 'grade']], hide_index=True)
+        with st.expander("📋 Browse grades", expanded=True):
+            grade_grid(db, "delete_grid", ['id', 'student_name', 'student_id', 'subject', 'grade', 'semester'])
+
+        record_id = st.number_input("Record ID to delete:", min_value=1, step=1)
+        record = db.get_grade_by_id(record_id)
+        if record is None:
+            st.warning(f"No grade with ID {record_id}.")
+        elif not record['is_verified']:
+            st.info(f"Record {record_id} is already deleted ({record['remarks']}).")
+        else:
+            st.dataframe(pd.DataFrame([record]), use_container_width=True, hide_index=True)
 
-            record_id = st.number_input("Record ID to delete:", min_value=1, step=1)
-            reason = st.text_area("Reason for deletion:")
+            # A form, so typing the reason does not rerun the page on every keystroke
+            with st.form("delete_form"):
+                reason = st.text_area("Reason for deletion:")
+                submitted = st.form_submit_button("🗑️ Delete Record")
 
-            if st.button("🗑️ Delete Record") and record_id:
+            if submitted:
                 block, res = db.delete_student_grade(record_id, reason)
                 if block:
                     st.success(f"✅ Record deleted! Block #{block['index']}")
@@ -237,37 +379,263 @@ def teacher_dashboard(db):
                 else:
                     st.error(f"❌ Error: {res}")
 
+    elif operation == "📜 Grade History":
+        st.subheader("📜 Grade History")
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            key = st.radio("History of:", ["Student ID", "Subject"])
+        with col2:
+            value = st.text_input(f"🔎 {key}:").strip()
+
+        if value:
+            if key == "Student ID":
+                history_df = db.get_history(student_id=value)
+            else:
+                history_df = db.get_history(subject=value)
+            if history_df.empty:
+                st.info("No blocks found.")
+            else:
+                st.caption(f"{history_df['block'].nunique()} blocks, {history_df['id'].nunique()} records")
+                st.dataframe(history_df, use_container_width=True, hide_index=True)
+
     elif operation == "📈 Analytics Dashboard":
         st.subheader("📈 Analytics Dashboard")
-        df = db.get_all_grades_sql()
-        if not df.empty:
+        source = st.radio("Data source:", ["Live database", "Parquet export"], horizontal=True)
+        if source == "Live database":
+            # Maintained incrementally as blocks are appended
+            analytics = db.get_analytics()
+        else:
+            export_file = st.file_uploader("student_grades export", type=["parquet"])
+            analytics = None
+            if export_file is not None:
+                df, export_meta = read_export(export_file)
+                analytics = GradeAggregates.from_frame(df[df['is_verified']]).summary()
+                st.caption(f"Exported {export_meta.get('exported_at')} at block #{export_meta.get('tip_index')}")
+        if analytics and analytics['rows']:
+            percentiles = analytics['gpa_percentiles']
+            cols = st.columns(len(percentiles) + 2)
+            cols[0].metric("👥 Students", analytics['students'])
+            cols[1].metric("✅ Pass Rate", f"{analytics['pass_rate'] * 100:.0f}%")
+            for col, (percentile, value) in zip(cols[2:], percentiles.items()):
+                col.metric(f"📈 GPA P{percentile}", f"{value:.2f}")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                grade_counts = analytics['grade_counts']
+                fig = px.bar(x=list(grade_counts.keys()), y=list(grade_counts.values()), title="Grade Distribution")
+                show_chart(fig, "grade_distribution")
+            with col2:
+                subject_counts = analytics['subject_counts']
+                fig = px.pie(values=list(subject_counts.values()), names=list(subject_counts.keys()),
+                             title="Subject Distribution")
+                show_chart(fig, "subject_distribution")
+
             col1, col2 = st.columns(2)
             with col1:
-                grade_counts = df['grade'].value_counts()
-                fig = px.bar(x=grade_counts.index, y=grade_counts.values, title="Grade Distribution")
-                st.plotly_chart(fig, use_container_width=True)
+                semester_df = pd.DataFrame([
+                    {'semester': semester, 'grade': grade, 'count': count}
+                    for semester, grades in analytics['semester_grades'].items()
+                    for grade, count in grades.items()
+                ])
+                fig = px.bar(semester_df, x='semester', y='count', color='grade', title="Grades per Semester")
+                show_chart(fig, "semester_distribution")
             with col2:
-                subject_counts = df['subject'].value_counts()
-                fig = px.pie(values=subject_counts.values, names=subject_counts.index, title="Subject Distribution")
-                st.plotly_chart(fig, use_container_width=True)
+                pass_rates = analytics['subject_pass_rates']
+                fig = px.bar(x=list(pass_rates.keys()), y=[rate * 100 for rate in pass_rates.values()],
+                             title="Pass Rate per Subject", labels={'x': 'Subject', 'y': 'Pass rate (%)'})
+                show_chart(fig, "subject_pass_rates")
+
+    elif operation == "📦 Export & Archive":
+        st.subheader("📦 Export & Archive")
+        if st.button("📦 Export to Parquet", use_container_width=True):
+            with st.spinner("Exporting..."):
+                summary, error = db.export_parquet()
+            if error:
+                st.error(f"❌ {error}")
+            else:
+                st.success(f"✅ Exported {summary['blocks']} blocks and {summary['grade_rows']} grade rows "
+                           f"(tip #{summary['tip_index']})")
+                if not summary['matches_chain']:
+                    st.warning("⚠️ The exported tip is not on the in-memory chain; verify the export before archiving it.")
+                col1, col2 = st.columns(2)
+                with col1:
+                    with open(summary['chain_path'], "rb") as f:
+                        st.download_button("⬇️ blockchain_log", f, file_name=summary['chain_path'].split("/")[-1],
+                                           use_container_width=True)
+                with col2:
+                    with open(summary['grades_path'], "rb") as f:
+                        st.download_button("⬇️ student_grades", f, file_name=summary['grades_path'].split("/")[-1],
+                                           use_container_width=True)
+
+        st.subheader("🔍 Verify an Export")
+        col1, col2 = st.columns(2)
+        with col1:
+            chain_file = st.file_uploader("blockchain_log export", type=["parquet"])
+        with col2:
+            grades_file = st.file_uploader("student_grades export (optional)", type=["parquet"])
+        if chain_file is not None and st.button("🔍 Verify Export", use_container_width=True):
+            with st.spinner("Verifying..."):
+                try:
+                    report = verify_export(chain_file, grades_file)
+                except Exception as e:
+                    report = None
+                    st.error(f"❌ {str(e)}")
+            if report and report['valid']:
+                st.success(f"✅ Export is valid: {report['blocks']} blocks, tip #{report['tip_index']}")
+            elif report:
+                st.error("❌ Export is not valid")
+                if report['problems']:
+                    st.dataframe(pd.DataFrame(report['problems'], columns=['Block', 'Problem']),
+                                 use_container_width=True, hide_index=True)
+                if report['drift']:
+                    st.dataframe(pd.DataFrame(report['drift']), use_container_width=True, hide_index=True)
 
     elif operation == "⛓️ Blockchain Stats":
         st.subheader("⛓️ Blockchain Statistics")
         stats = db.get_blockchain_stats()
 
-        col1, col2 = st.columns(2)
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
             st.metric("SQL Records", stats['sql_count'])
         with col2:
             st.metric("Blockchain Blocks", stats['blockchain_count'])
+        with col3:
+            st.metric("Records Inserted", stats['inserts'])
+        with col4:
+            st.metric("Records Deleted", stats['deletes'])
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Live Records (chain)", stats['live_records'])
+        with col2:
+            st.metric("Bulk Blocks", stats['bulk_blocks'])
+        with col3:
+            st.metric("Chain Size", f"{stats['chain_bytes'] / 1024:.1f} KB")
+        with col4:
+            last_checkpoint = stats['last_checkpoint']
+            st.metric("Last Verified Block", f"#{last_checkpoint}" if last_checkpoint is not None else "Never")
+
+        if stats['blocks_per_day']:
+            fig = px.bar(
+                x=list(stats['blocks_per_day'].keys()),
+                y=list(stats['blocks_per_day'].values()),
+                title="Blocks per Day",
+                labels={'x': 'Date', 'y': 'Blocks'}
+            )
+            show_chart(fig, "blocks_per_day")
+
+        cache_stats = stats['cache']
+        st.caption(
+            f"Query cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']}/{cache_stats['max_entries']} entries)"
+        )
+        writer_stats = db.writer.stats()
+        st.caption(
+            f"Write pipeline: {writer_stats['ops_committed']} writes in {writer_stats['groups_committed']} group commits "
+            f"(avg {writer_stats['avg_group_size']:.1f} per group, {writer_stats['queued']} queued)"
+        )
+        st.caption(f"Sealed epochs: {stats['epochs']} · blocks resident in memory: {stats['resident_blocks']} "
+                   f"({stats['resident_bytes'] / 1024:.1f} KB)")
+        if db.snapshot_path:
+            st.caption(f"Local snapshot: {stats['snapshot_blocks']} blocks in {db.snapshot_path}")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            verify_clicked = st.button("🔍 Verify Blockchain", use_container_width=True)
+        with col2:
+            audit_clicked = st.button("🧾 Full Audit", use_container_width=True)
+        with col3:
+            reconcile_clicked = st.button("🧮 Reconcile Table", use_container_width=True)
 
-        if st.button("🔍 Verify Blockchain"):
+        if verify_clicked:
             is_valid, message = db.verify_blockchain_integrity()
             if is_valid:
                 st.success(f"✅ {message}")
             else:
                 st.error(f"❌ {message}")
 
+        if audit_clicked:
+            with st.spinner("Auditing every block..."):
+                is_valid, message, problems = db.audit_blockchain()
+            if is_valid:
+                st.success(f"✅ {message}")
+            else:
+                st.error(f"❌ {message}")
+                st.dataframe(pd.DataFrame(problems, columns=['Block', 'Problem']),
+                             use_container_width=True, hide_index=True)
+
+        if reconcile_clicked:
+            with st.spinner("Comparing the table with the chain..."):
+                drift, error = db.reconcile_table()
+            if error:
+                st.error(f"❌ {error}")
+            elif not drift:
+                st.success("✅ Every grade row matches the chain")
+            else:
+                st.error(f"❌ {len(drift)} rows differ from what the chain recorded")
+                drift_df = pd.DataFrame(drift).rename(columns={
+                    'id': 'ID', 'issue': 'Issue', 'block': 'Block', 'details': 'Details'
+                })
+                st.dataframe(drift_df, use_container_width=True, hide_index=True)
+
+    elif operation == "🕰️ Time Travel":
+        st.subheader("🕰️ Time Travel")
+        tip = len(db.chain) - 1
+        mode = st.radio("As of:", ["Block", "Date"], horizontal=True)
+        student_id = st.text_input("🆔 Student ID (optional)").strip()
+
+        if mode == "Block":
+            block_index = st.number_input("Block index:", min_value=0, max_value=tip, value=tip, step=1)
+            df, error = db.get_state_at(int(block_index), student_id or None)
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                day = st.date_input("Date:")
+            with col2:
+                moment = st.time_input("Time:", value=datetime.max.time().replace(microsecond=0))
+            block_index, df, error = db.get_state_at_time(datetime.combine(day, moment), student_id or None)
+
+        if error:
+            st.error(f"❌ {error}")
+        else:
+            st.caption(f"State after block #{block_index} "
+                       f"({db.chain.timestamp_at(block_index)}): {len(df)} rows, "
+                       f"{int(df['is_verified'].sum()) if not df.empty else 0} active")
+            st.dataframe(df, use_container_width=True, hide_index=True)
+
+    elif operation == "📉 Performance":
+        st.subheader("📉 Performance")
+        perf_df = pd.DataFrame(REGISTRY.snapshot())
+        if not perf_df.empty:
+            perf_df = perf_df[perf_df['count'] > 0].sort_values('total_ms', ascending=False)
+
+        if perf_df.empty:
+            st.info("No calls recorded yet.")
+        else:
+            fig = px.bar(perf_df.head(20), x='total_ms', y='call', orientation='h', title="Total Time by Call (ms)")
+            show_chart(fig, "performance_total_time")
+
+            st.dataframe(
+                perf_df[['call', 'count', 'errors', 'mean_ms', 'p50_ms', 'p99_ms', 'total_ms']],
+                use_container_width=True,
+                hide_index=True
+            )
+            st.caption("p50/p99 are histogram bucket upper bounds.")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "📥 Export Prometheus Metrics",
+                REGISTRY.to_prometheus(),
+                file_name="blockchain_metrics.prom",
+                mime="text/plain",
+                use_container_width=True
+            )
+        with col2:
+            if st.button("♻️ Reset Metrics", use_container_width=True):
+                REGISTRY.reset()
+                st.rerun()
+
     elif operation == "🔄 Reset Database (Admin)":
         st.subheader("🔄 Reset Database")
         st.warning("⚠️ This will delete ALL data permanently!")
@@ -295,6 +663,9 @@ def main():
         st.error(f"❌ Database Error: {str(e)}")
         return
 
+    # Pick up blocks written by other server processes (rate-limited)
+    db.sync_tail()
+
     # Check authentication
     if not st.session_state["logged_in"]:
         login_page()
@@ -0,0 +1,272 @@
+"""Benchmarks for the BlockchainSupabaseDB layer at realistic chain sizes.
+
+Runs offline against SQLiteBackend as a local stand-in for Supabase:
+
+    python -m benchmarks.bench_db --sizes 10000,100000,1000000 --output bench.json
+    python -m benchmarks.bench_db --sizes 10000 --compare bench.json
+
+Each size gets a synthetic chain (one INSERT block per grade row, plus a
+few DELETE blocks) generated once into --workdir and reused on later runs.
+For every operation the report has throughput, p50/p99 latency and the
+peak traced memory of one extra run.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from storage import SQLiteBackend
+from chain_store import canonical_data, hash_block
+from blockchain_supabase import BlockchainSupabaseDB, GRADES, SEMESTERS
+
+SUBJECTS = ["Mathematics", "Physics", "Chemistry", "Biology", "History", "English", "Economics", "Art"]
+FIRST_NAMES = ["Alice", "Bob", "Carol", "David", "Eve", "Frank", "Grace", "Heidi", "Ivan", "Judy"]
+LAST_NAMES = ["Smith", "Jones", "Brown", "Taylor", "Wilson", "Davies", "Evans", "Thomas", "Roberts", "Walker"]
+GENERATE_BATCH = 5000
+
+
+def generate_chain(path, size, seed=0):
+    """Write a valid synthetic chain of size blocks (plus genesis) to a SQLite file"""
+    rng = random.Random(seed)
+    backend = SQLiteBackend(path)
+    start = datetime(2024, 1, 1)
+
+    timestamp = start.isoformat()
+    genesis_data = 'Genesis Block - Student Grade System'
+    previous_hash = hash_block(0, timestamp, genesis_data, '0')
+    backend.insert_block({
+        "block_index": 0, "timestamp": timestamp, "data_hash": genesis_data,
+        "previous_hash": '0', "block_hash": previous_hash, "sql_operation": 'INIT_DB'
+    })
+
+    index = 1
+    while index <= size:
+        batch = min(GENERATE_BATCH, size - index + 1)
+        records = []
+        for _ in range(batch):
+            records.append({
+                "student_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "student_id": str(rng.randint(1, max(1, size // 8))),
+                "subject": rng.choice(SUBJECTS),
+                "grade": rng.choice(GRADES),
+                "semester": rng.choice(SEMESTERS),
+                "remarks": ""
+            })
+        rows = backend.insert_grades(records)
+
+        block_rows = []
+        for record, row in zip(records, rows):
+            timestamp = (start + timedelta(seconds=index * 7)).isoformat()
+            if index > 10 and rng.random() < 0.02:
+                # Occasional DELETE of an earlier row, as in real usage
+                data = {'sql_id': rng.randint(1, row['id']), 'operation': 'DELETE',
+                        'reason': 'benchmark', 'timestamp': timestamp}
+                sql_operation = f"DELETE ID:{data['sql_id']}"
+            else:
+                data = dict(record, sql_id=row['id'], timestamp=timestamp, operation='INSERT')
+                sql_operation = f"INSERT ID:{row['id']}"
+            block_hash = hash_block(index, timestamp, canonical_data(data), previous_hash)
+            block_rows.append({
+                "block_index": index, "timestamp": timestamp, "data_hash": json.dumps(data, sort_keys=True),
+                "previous_hash": previous_hash, "block_hash": block_hash, "sql_operation": sql_operation
+            })
+            previous_hash = block_hash
+            index += 1
+        backend.insert_blocks(block_rows)
+
+    backend.close()
+
+
+def prepare_database(workdir, size):
+    """Path to a generated chain of the given size, copied so runs never see each other's writes"""
+    template = os.path.join(workdir, f"chain_{size}.db")
+    if not os.path.exists(template):
+        print(f"  generating {size} blocks into {template} ...", flush=True)
+        generate_chain(template + ".tmp", size)
+        os.replace(template + ".tmp", template)
+    path = os.path.join(workdir, f"run_{size}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    source = sqlite3.connect(template)
+    target = sqlite3.connect(path)
+    source.backup(target)
+    source.close()
+    target.close()
+    return path
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(name, operation, repeat, setup=None):
+    """Time repeat calls of operation(i), then trace peak memory of one more call"""
+    latencies = []
+    for i in range(repeat):
+        if setup:
+            setup(i)
+        started = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - started)
+
+    if setup:
+        setup(repeat)
+    tracemalloc.start()
+    operation(repeat)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total = sum(latencies)
+    result = {
+        'operation': name,
+        'runs': repeat,
+        'throughput_ops_per_s': repeat / total if total else None,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'peak_memory_mb': peak_bytes / (1024 * 1024)
+    }
+    print(f"  {name:<34} p50 {result['p50_ms']:10.2f} ms  p99 {result['p99_ms']:10.2f} ms  "
+          f"{result['throughput_ops_per_s'] or 0:10.1f} ops/s  peak {result['peak_memory_mb']:8.1f} MB", flush=True)
+    return result
+
+
+def bench_size(workdir, size, repeat):
+    path = prepare_database(workdir, size)
+    results = []
+    rng = random.Random(1)
+
+    # Cold load: a fresh process-level instance streaming the whole chain
+    load_repeat = max(1, min(repeat, 3 if size >= 100000 else repeat))
+    results.append(measure(
+        'load_existing_chain',
+        lambda i: BlockchainSupabaseDB(SQLiteBackend(path)),
+        load_repeat
+    ))
+
+    # Warm start: same, but from a local chain snapshot plus the blocks after it
+    snapshot_path = path + ".snapshot"
+    if os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+    BlockchainSupabaseDB(SQLiteBackend(path), snapshot_path=snapshot_path)
+    results.append(measure(
+        'load_from_snapshot',
+        lambda i: BlockchainSupabaseDB(SQLiteBackend(path), snapshot_path=snapshot_path),
+        load_repeat
+    ))
+
+    db = BlockchainSupabaseDB(SQLiteBackend(path))
+
+    results.append(measure(
+        'verify_blockchain_integrity_full',
+        lambda i: db.verify_blockchain_integrity(full_audit=True),
+        max(1, min(repeat, 3))
+    ))
+
+    results.append(measure(
+        'verify_blockchain_integrity_incremental',
+        lambda i: db.verify_blockchain_integrity(),
+        repeat,
+        setup=lambda i: db.add_student_grade(f"Bench {i}", "1", "Mathematics", "A", "Fall")
+    ))
+
+    results.append(measure(
+        'add_student_grade',
+        lambda i: db.add_student_grade(f"Bench {i}", str(i), rng.choice(SUBJECTS), "B", "Spring"),
+        repeat
+    ))
+
+    def add_concurrently(i, count=200):
+        futures = [db.submit_student_grade(f"Burst {i}-{n}", str(n), "Physics", "A", "Fall") for n in range(count)]
+        for future in futures:
+            future.result()
+
+    results.append(measure('add_student_grade_burst_200', add_concurrently, max(1, repeat // 10)))
+
+    terms = [rng.choice(FIRST_NAMES + LAST_NAMES + SUBJECTS)[:rng.randint(3, 6)] for _ in range(repeat + 1)]
+    results.append(measure(
+        'search_students_sql',
+        lambda i: db.search_students_sql(terms[i]),
+        repeat,
+        setup=lambda i: db.cache.invalidate()
+    ))
+
+    results.append(measure(
+        'get_blockchain_stats',
+        lambda i: db.get_blockchain_stats(),
+        repeat,
+        setup=lambda i: db.cache.invalidate()
+    ))
+
+    db.backend.close()
+    return {'size': size, 'chain_bytes': db.chain.nbytes(), 'results': results}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def compare(current, previous_path):
+    """Print p50/p99 ratios against an earlier result file"""
+    with open(previous_path) as f:
+        previous = json.load(f)
+    before = {(s['size'], r['operation']): r for s in previous['sizes'] for r in s['results']}
+    print(f"\nComparison with {previous_path} (commit {previous.get('commit')}); ratio > 1 means slower")
+    for entry in current['sizes']:
+        for result in entry['results']:
+            old = before.get((entry['size'], result['operation']))
+            if old and old['p50_ms'] and old['p99_ms']:
+                print(f"  {entry['size']:>8} {result['operation']:<40} "
+                      f"p50 x{result['p50_ms'] / old['p50_ms']:.2f}  p99 x{result['p99_ms'] / old['p99_ms']:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated chain sizes")
+    parser.add_argument("--repeat", type=int, default=50, help="timed runs per operation")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "blockchain_bench"),
+                        help="where generated chains are kept between runs")
+    parser.add_argument("--output", default="bench_results.json", help="JSON result file")
+    parser.add_argument("--compare", help="earlier JSON result file to compare against")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'sizes': []
+    }
+
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"Chain size {size}", flush=True)
+        report['sizes'].append(bench_size(args.workdir, size, args.repeat))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+from array import array
+from bisect import bisect_right
+
+
+class BlockIndex:
+    """Secondary index from student_id, subject and sql_id to chain positions.
+
+    Updated from the block dicts as they are appended. DELETE blocks only
+    carry a sql_id, so they are filed under the student and subject of the
+    row they delete. If blocks were added while the index was out of step
+    (e.g. after loading a chain snapshot), catch_up() indexes the rest.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.by_student = {}
+        self.by_subject = {}
+        self.by_sql_id = {}
+        self._rows = {}  # sql_id -> (student_id, subject)
+        self.position = 0
+        self._last_hash = None
+
+    def add(self, block):
+        """Index one block; ignored unless it is the next position"""
+        pos = block['index']
+        if pos != self.position:
+            return
+
+        sql_operation = block.get('sql_operation') or ''
+        data = block['data']
+        if sql_operation.startswith('BULK_INSERT'):
+            for record in data.get('records', []):
+                self._add_row(record, pos)
+        elif sql_operation.startswith('INSERT'):
+            self._add_row(data, pos)
+        elif sql_operation.startswith('DELETE'):
+            sql_id = data.get('sql_id')
+            self._file(self.by_sql_id, sql_id, pos)
+            if sql_id in self._rows:
+                student_id, subject = self._rows[sql_id]
+                self._file(self.by_student, student_id, pos)
+                self._file(self.by_subject, subject, pos)
+
+        self.position = pos + 1
+        self._last_hash = block['hash']
+
+    def _add_row(self, record, pos):
+        student_id, subject = str(record.get('student_id')), str(record.get('subject'))
+        self._rows[record['sql_id']] = (student_id, subject)
+        self._file(self.by_sql_id, record['sql_id'], pos)
+        self._file(self.by_student, student_id, pos)
+        self._file(self.by_subject, subject, pos)
+
+    @staticmethod
+    def _file(index, key, pos):
+        positions = index.get(key)
+        if positions is None:
+            index[key] = positions = array('q')
+        if not positions or positions[-1] != pos:
+            positions.append(pos)
+
+    def catch_up(self, chain):
+        """Index blocks the index has not seen, starting over if the chain changed underneath"""
+        if self.position and (self.position > len(chain) or chain.hash_at(self.position - 1) != self._last_hash):
+            self.reset()
+        for pos in range(self.position, len(chain)):
+            self.add(chain[pos])
+
+    def positions(self, student_id=None, subject=None, sql_id=None, until=None):
+        """Sorted positions of blocks touching the given key, optionally only those <= until"""
+        if student_id is not None:
+            positions = self.by_student.get(str(student_id), ())
+        elif subject is not None:
+            positions = self.by_subject.get(str(subject), ())
+        else:
+            positions = self.by_sql_id.get(sql_id, ())
+        if until is not None:
+            positions = positions[:bisect_right(positions, until)]
+        return list(positions)
@@ -0,0 +1,104 @@
+"""Full-chain audit spread across a process pool.
+
+Each block's hash depends only on its own fields and its stored
+previous_hash, so the chain is cut into segments that are checked in
+parallel. Every segment starts with the last block of the one before it,
+which stitches the links at the boundaries. Usable from the app or as a CLI:
+
+    python -m chain_audit --sqlite blockchain.db
+    python -m chain_audit --supabase-url URL --supabase-key KEY --workers 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chain_store import hash_block
+from merkle import records_match_root
+
+# Below this many blocks the process start-up costs more than it saves
+PARALLEL_THRESHOLD = 20000
+SEGMENTS_PER_WORKER = 4
+MIN_SEGMENT_SIZE = 1000
+
+
+def check_blocks(chain, start=1, stop=None, first_only=False):
+    """Check positions start..stop-1 against their own fields and their predecessor.
+
+    Returns a list of (position, problem) pairs, empty if every block is valid.
+    """
+    stop = len(chain) if stop is None else stop
+    problems = []
+    for i in range(start, stop):
+        previous_hash = chain.previous_hash_at(i)
+        expected_hash = hash_block(chain.index_at(i), chain.timestamp_at(i), chain.hash_input_at(i), previous_hash)
+
+        if chain.hash_at(i) != expected_hash:
+            problems.append((i, "hash is invalid"))
+        if chain.is_merkle_at(i) and not records_match_root(chain.data_at(i)):
+            problems.append((i, "records do not match its Merkle root"))
+        if previous_hash != chain.hash_at(i - 1):
+            problems.append((i, "chain link is broken"))
+
+        if first_only and problems:
+            break
+    return problems
+
+
+def _check_segment(segment):
+    # Position 0 is the previous segment's last block, only there for the link check
+    return check_blocks(segment, 1)
+
+
+def audit_chain(chain, workers=None):
+    """Check every block after genesis; returns all (position, problem) pairs.
+
+    Long chains are split over a pool of worker processes. The pool uses
+    spawn rather than fork since the app process runs background threads.
+    """
+    size = len(chain)
+    workers = workers or os.cpu_count() or 1
+    if size <= 1:
+        return []
+    if workers == 1 or size < PARALLEL_THRESHOLD:
+        return check_blocks(chain, 1)
+
+    segment_size = max(MIN_SEGMENT_SIZE, -(-(size - 1) // (workers * SEGMENTS_PER_WORKER)))
+    starts = range(1, size, segment_size)
+    segments = (chain.segment(start - 1, min(size, start + segment_size)) for start in starts)
+
+    problems = []
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for start, found in zip(starts, pool.map(_check_segment, segments)):
+            problems.extend((start - 1 + pos, problem) for pos, problem in found)
+    return problems
+
+
+def main(argv=None):
+    from blockchain_supabase import BlockchainSupabaseDB, add_backend_arguments, backend_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_backend_arguments(parser)
+    parser.add_argument("--snapshot", help="local chain snapshot to start from")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    backend = backend_from_args(parser, args)
+
+    started = time.perf_counter()
+    db = BlockchainSupabaseDB(backend, snapshot_path=args.snapshot)
+    print(f"Loaded {len(db.chain)} blocks in {time.perf_counter() - started:.1f}s", flush=True)
+
+    started = time.perf_counter()
+    is_valid, message, problems = db.audit_blockchain(workers=args.workers)
+    print(f"{message} in {time.perf_counter() - started:.1f}s")
+    for pos, problem in problems:
+        print(f"  Block {pos} {problem}")
+    return 0 if is_valid else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""Columnar (Parquet) export of blockchain_log and student_grades.
+
+Exports stream page by page into a ParquetWriter, so memory stays bounded
+by one page. Each file carries the chain tip it was taken at in its
+key/value metadata, and verify_export() checks a chain file (and
+optionally a grades file against it) without any backend connection:
+
+    python -m chain_export export --sqlite blockchain.db --directory exports
+    python -m chain_export verify exports/blockchain_log_<stamp>.parquet exports/student_grades_<stamp>.parquet
+"""
+import argparse
+import sys
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from chain_store import ChainStore, block_from_row
+from chain_audit import audit_chain
+from epochs import check_seals
+from reconcile import LedgerReconciler
+
+EXPORT_FORMAT = "blockchain_project/1"
+VERIFY_BATCH_SIZE = 10000
+
+BLOCK_SCHEMA = pa.schema([
+    ("block_index", pa.int64()),
+    ("timestamp", pa.string()),
+    ("data_hash", pa.string()),
+    ("previous_hash", pa.string()),
+    ("block_hash", pa.string()),
+    ("sql_operation", pa.string())
+])
+
+GRADE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("student_name", pa.string()),
+    ("student_id", pa.string()),
+    ("subject", pa.string()),
+    ("grade", pa.string()),
+    ("semester", pa.string()),
+    ("remarks", pa.string()),
+    ("is_verified", pa.bool_()),
+    ("created_at", pa.string())
+])
+
+
+def _write_pages(path, schema, pages, kind, tip=None):
+    """Stream pages of row dicts into a Parquet file; returns its metadata.
+
+    The chain tip goes into the footer metadata, which is only written on
+    close; for blockchain_log it is the last exported block unless given.
+    """
+    written, last_row = 0, None
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for page in pages:
+            columns = {name: [row.get(name) for row in page] for name in schema.names}
+            if 'created_at' in columns:
+                columns['created_at'] = [None if value is None else str(value) for value in columns['created_at']]
+            writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+            written += len(page)
+            last_row = page[-1]
+
+        if tip is None:
+            tip = (last_row['block_index'], last_row['block_hash']) if last_row else (-1, "0")
+        writer.add_key_value_metadata({
+            'format': EXPORT_FORMAT,
+            'kind': kind,
+            'rows': str(written),
+            'tip_index': str(tip[0]),
+            'tip_hash': tip[1],
+            'exported_at': datetime.now().isoformat()
+        })
+    return read_metadata(path)
+
+
+def export_blocks(pages, path):
+    """Write blockchain_log pages to path; returns the metadata stored with it"""
+    return _write_pages(path, BLOCK_SCHEMA, pages, 'blockchain_log')
+
+
+def export_grades(pages, path, tip_index, tip_hash):
+    """Write student_grades pages to path, recording the chain tip they correspond to"""
+    return _write_pages(path, GRADE_SCHEMA, pages, 'student_grades', tip=(tip_index, tip_hash))
+
+
+def read_metadata(source):
+    """Export metadata (format, kind, rows, tip_index, tip_hash, exported_at) of a file"""
+    raw = pq.ParquetFile(source).metadata.metadata or {}
+    return {key.decode(): value.decode() for key, value in raw.items() if not key.startswith(b'ARROW')}
+
+
+def read_export(source, columns=None):
+    """Load an export into pandas, memory-mapped and Arrow-backed; returns (DataFrame, metadata)"""
+    table = pq.read_table(source, columns=columns, memory_map=isinstance(source, str))
+    return table.to_pandas(types_mapper=pd.ArrowDtype), read_metadata(source)
+
+
+def _iter_rows(source, batch_size=VERIFY_BATCH_SIZE):
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=batch_size):
+        yield batch.to_pylist()
+
+
+def load_chain(source):
+    """Rebuild a ChainStore from a blockchain_log export, one record batch at a time"""
+    chain = ChainStore()
+    for rows in _iter_rows(source):
+        chain.extend(block_from_row(row) for row in rows)
+    return chain
+
+
+def verify_export(chain_source, grades_source=None, workers=None):
+    """Check an export offline; returns a report dict with every problem found.
+
+    The chain file is re-hashed block by block and its last block compared
+    with the tip in its metadata. A grades file is reconciled against the
+    chain as it stood at the grades file's tip; rows written while the
+    grades were being exported show up as drift.
+    """
+    meta = read_metadata(chain_source)
+    if meta.get('format') != EXPORT_FORMAT or meta.get('kind') != 'blockchain_log':
+        raise ValueError("not a blockchain_log export")
+
+    chain = load_chain(chain_source)
+    problems = [(pos, "index is out of sequence") for pos in range(len(chain)) if chain.index_at(pos) != pos]
+    problems += audit_chain(chain, workers) + check_seals(chain)
+    tip_hash = chain.hash_at(-1) if chain else "0"
+    if tip_hash != meta['tip_hash'] or len(chain) != int(meta['rows']):
+        problems.append((len(chain) - 1, "tip does not match the export metadata"))
+    problems.sort()
+
+    report = {
+        'blocks': len(chain),
+        'tip_index': len(chain) - 1,
+        'tip_hash': tip_hash,
+        'problems': problems,
+        'grade_rows': None,
+        'drift': None
+    }
+
+    if grades_source is not None:
+        grades_meta = read_metadata(grades_source)
+        if grades_meta.get('format') != EXPORT_FORMAT or grades_meta.get('kind') != 'student_grades':
+            raise ValueError("not a student_grades export")
+        tip = int(grades_meta['tip_index'])
+        if not 0 <= tip < len(chain) or chain.hash_at(tip) != grades_meta['tip_hash']:
+            problems.append((tip, "grades export was taken at a tip that is not on this chain"))
+        else:
+            reconciler = LedgerReconciler()
+            chain_at_tip = chain.segment(0, tip + 1)
+            reconciler.replay(chain_at_tip)
+            drift = reconciler.compare(chain_at_tip, _iter_rows(grades_source))
+            for item in drift:
+                del item['row']
+            report['drift'] = drift
+        report['grade_rows'] = int(grades_meta['rows'])
+
+    report['valid'] = not problems and not report['drift']
+    return report
+
+
+def main(argv=None):
+    from blockchain_supabase import BlockchainSupabaseDB, add_backend_arguments, backend_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="export both tables from a backend")
+    add_backend_arguments(export_parser)
+    export_parser.add_argument("--directory", default="exports")
+    verify_parser = commands.add_parser("verify", help="check export files offline")
+    verify_parser.add_argument("chain_file")
+    verify_parser.add_argument("grades_file", nargs="?")
+    verify_parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    if args.command == "verify":
+        report = verify_export(args.chain_file, args.grades_file, args.workers)
+        print(f"{report['blocks']} blocks, tip #{report['tip_index']} {report['tip_hash']}")
+        for pos, problem in report['problems']:
+            print(f"  Block {pos} {problem}")
+        for item in report['drift'] or []:
+            print(f"  Row {item['id']} {item['issue']}: {item['details']}")
+        print("Export is valid" if report['valid'] else "Export is NOT valid")
+        return 0 if report['valid'] else 1
+
+    backend = backend_from_args(export_parser, args)
+
+    summary, error = BlockchainSupabaseDB(backend).export_parquet(args.directory)
+    if error:
+        print(error)
+        return 1
+    print(f"Wrote {summary['blocks']} blocks to {summary['chain_path']}")
+    print(f"Wrote {summary['grade_rows']} grade rows to {summary['grades_path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+from collections import Counter
+
+
+class ChainCounters:
+    """Running totals over the chain, updated as blocks are appended"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.blocks = 0
+        self.insert_blocks = 0
+        self.bulk_blocks = 0
+        self.delete_blocks = 0
+        self.inserts = 0
+        self.deletes = 0
+        self.chain_bytes = 0
+        self.blocks_per_day = Counter()
+
+    def add(self, block, nbytes=0):
+        """Count one appended block taking nbytes in the chain store"""
+        self.chain_bytes += nbytes
+        if block['index'] == 0:
+            return  # Genesis block carries no records
+
+        self.blocks += 1
+        self.blocks_per_day[str(block['timestamp'])[:10]] += 1
+
+        sql_operation = block.get('sql_operation') or ''
+        if sql_operation.startswith('BULK_INSERT'):
+            data = block['data']
+            self.bulk_blocks += 1
+            self.inserts += data.get('record_count', len(data.get('records', [])))
+        elif sql_operation.startswith('INSERT'):
+            self.insert_blocks += 1
+            self.inserts += 1
+        elif sql_operation.startswith('DELETE'):
+            self.delete_blocks += 1
+            self.deletes += 1
+
+    def rebuild(self, chain):
+        """Recount from scratch, e.g. after the chain was truncated"""
+        self.reset()
+        for pos in range(len(chain)):
+            self.add(chain[pos], chain.block_nbytes(pos))
+
+    def restore(self, state):
+        """Load counters previously returned by snapshot()"""
+        self.blocks = state['blocks']
+        self.insert_blocks = state['insert_blocks']
+        self.bulk_blocks = state['bulk_blocks']
+        self.delete_blocks = state['delete_blocks']
+        self.inserts = state['inserts']
+        self.deletes = state['deletes']
+        self.chain_bytes = state.get('chain_bytes', 0)  # Absent from seals and snapshots written before it was kept
+        self.blocks_per_day = Counter(state['blocks_per_day'])
+
+    def snapshot(self):
+        """Plain-dict copy of the counters"""
+        return {
+            'blocks': self.blocks,
+            'insert_blocks': self.insert_blocks,
+            'bulk_blocks': self.bulk_blocks,
+            'delete_blocks': self.delete_blocks,
+            'inserts': self.inserts,
+            'deletes': self.deletes,
+            'live_records': self.inserts - self.deletes,
+            'chain_bytes': self.chain_bytes,
+            'blocks_per_day': dict(sorted(self.blocks_per_day.items()))
+        }
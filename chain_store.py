@@ -0,0 +1,493 @@
+import json
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+DIGEST_SIZE = 32
+BLOCK_ARRAY_BYTES = 8 + 8 + 2 * DIGEST_SIZE + 8 + 8  # index, timestamp, both hashes and both offsets
+
+# Payload tags: canonical JSON object, Merkle block, plain string, any other JSON value
+TAG_DICT = ord('d')
+TAG_MERKLE = ord('m')
+TAG_STR = ord('s')
+TAG_JSON = ord('j')
+
+BLOCK_FIELDS = ('index', 'timestamp', 'data', 'previous_hash', 'hash', 'sql_operation')
+
+# Snapshot file: magic, version, block count, payload size, metadata length
+SNAPSHOT_MAGIC = b'CHAINSNP'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<8sIQQI')
+
+
+def canonical_data(data):
+    """String form of block data that goes into the block hash"""
+    if isinstance(data, dict):
+        if 'merkle_root' in data:
+            # Merkle blocks commit to their records only through the root
+            data = {key: value for key, value in data.items() if key != 'records'}
+        return json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return str(data)
+
+
+def hash_block(index, timestamp, data_str, previous_hash):
+    """SHA-256 of a block's fields, data already in canonical form"""
+    hash_string = f"{index}|{timestamp}|{data_str}|{previous_hash}"
+    return hashlib.sha256(hash_string.encode('utf-8')).hexdigest()
+
+
+def block_from_row(row):
+    """Convert a blockchain_log row into a block dict"""
+    try:
+        data = json.loads(row['data_hash'])
+    except:
+        data = row['data_hash']
+
+    return {
+        'index': row['block_index'],
+        'timestamp': row['timestamp'],
+        'data': data,
+        'previous_hash': row['previous_hash'],
+        'hash': row['block_hash'],
+        'sql_operation': row['sql_operation']
+    }
+
+
+def _encode_timestamp(timestamp):
+    """Microseconds since the epoch, or None if the string would not round-trip"""
+    try:
+        dt = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is not None:
+        return None
+    micros = (dt - EPOCH) // ONE_MICROSECOND
+    if _decode_timestamp(micros) != timestamp:
+        return None
+    return micros
+
+
+def _decode_timestamp(micros):
+    return (EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def _encode_digest(value):
+    """32 raw bytes for a lowercase SHA-256 hex string, else None"""
+    if not isinstance(value, str) or len(value) != 2 * DIGEST_SIZE:
+        return None
+    try:
+        digest = bytes.fromhex(value)
+    except ValueError:
+        return None
+    return digest if digest.hex() == value else None
+
+
+class BlockView(Mapping):
+    """Read-only dict-like view of one block; data is decoded on access"""
+
+    __slots__ = ('_store', '_pos')
+
+    def __init__(self, store, pos):
+        self._store = store
+        self._pos = pos
+
+    def __getitem__(self, key):
+        store = self._store
+        pos = self._pos
+        if key == 'index':
+            return store.index_at(pos)
+        if key == 'timestamp':
+            return store.timestamp_at(pos)
+        if key == 'data':
+            return store.data_at(pos)
+        if key == 'previous_hash':
+            return store.previous_hash_at(pos)
+        if key == 'hash':
+            return store.hash_at(pos)
+        if key == 'sql_operation':
+            return store.sql_operation_at(pos)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(BLOCK_FIELDS)
+
+    def __len__(self):
+        return len(BLOCK_FIELDS)
+
+    def __repr__(self):
+        return f"BlockView({dict(self)!r})"
+
+
+class ChainStore:
+    """Compact, list-like in-memory chain.
+
+    Blocks live in parallel arrays: integer indexes and timestamps, 32-byte
+    binary digests and offsets into one packed payload buffer holding the
+    canonical data and sql_operation. Indexing returns a BlockView, so
+    chain[i]['hash'], chain[-1] and len(chain) behave like the old list of
+    dicts. Values that would not round-trip through the compact form (odd
+    timestamps or non-SHA-256 hashes such as the genesis '0') are kept as
+    strings in small side tables.
+    """
+
+    def __init__(self, blocks=()):
+        self._indexes = array('q')
+        self._timestamps = array('q')
+        self._hashes = bytearray()
+        self._previous_hashes = bytearray()
+        # Block i's data spans _offsets[i].._op_offsets[i], its sql_operation up to _offsets[i + 1].
+        # Offsets are global: the first _base_size bytes live in _base (a memory-mapped
+        # snapshot, read-only), everything appended later in _payload.
+        self._base = memoryview(b'')
+        self._base_size = 0
+        self._mmap = None
+        self._payload = bytearray()
+        self._offsets = array('Q', [0])
+        self._op_offsets = array('Q')
+        self._odd_timestamps = {}
+        self._odd_hashes = {}
+        self._odd_previous_hashes = {}
+        self.extend(blocks)
+
+    # List-like behaviour
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __iter__(self):
+        for pos in range(len(self)):
+            yield BlockView(self, pos)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [BlockView(self, pos) for pos in range(*key.indices(len(self)))]
+        return BlockView(self, self._position(key))
+
+    def __delitem__(self, key):
+        # Only truncating the tail is supported: del chain[n:]
+        if not isinstance(key, slice) or key.step not in (None, 1) or key.stop not in (None, len(self)):
+            raise TypeError("ChainStore only supports deleting a tail slice")
+        self.truncate(key.indices(len(self))[0])
+
+    def __repr__(self):
+        return f"ChainStore({len(self)} blocks)"
+
+    def __getstate__(self):
+        # The mapped snapshot cannot be pickled, so ship its bytes in the payload
+        state = dict(self.__dict__)
+        state['_payload'] = bytearray(self._base) + self._payload
+        state['_base'] = None
+        state['_base_size'] = 0
+        state['_mmap'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._base = memoryview(b'')
+
+    def _position(self, pos):
+        size = len(self)
+        if pos < 0:
+            pos += size
+        if not 0 <= pos < size:
+            raise IndexError("chain index out of range")
+        return pos
+
+    def append(self, block):
+        """Append a block given as a mapping with the usual block fields"""
+        pos = len(self)
+        micros = _encode_timestamp(block['timestamp'])
+        if micros is None:
+            self._odd_timestamps[pos] = block['timestamp']
+            micros = 0
+        self._timestamps.append(micros)
+
+        self._append_digest(self._hashes, self._odd_hashes, pos, block['hash'])
+        self._append_digest(self._previous_hashes, self._odd_previous_hashes, pos, block['previous_hash'])
+
+        data = block['data']
+        if isinstance(data, dict) and 'merkle_root' in data:
+            tag, text = TAG_MERKLE, json.dumps(data, sort_keys=True, separators=(',', ':'))
+        elif isinstance(data, dict):
+            tag, text = TAG_DICT, canonical_data(data)
+        elif isinstance(data, str):
+            tag, text = TAG_STR, data
+        else:
+            tag, text = TAG_JSON, json.dumps(data)
+        self._payload.append(tag)
+        self._payload += text.encode('utf-8')
+        self._op_offsets.append(self._base_size + len(self._payload))
+        self._payload += (block.get('sql_operation') or '').encode('utf-8')
+        self._offsets.append(self._base_size + len(self._payload))
+        # len() counts _indexes, so readers on other threads only see the block once it is complete
+        self._indexes.append(block['index'])
+
+    def extend(self, blocks):
+        for block in blocks:
+            self.append(block)
+
+    def truncate(self, size):
+        """Drop every block from position size onwards"""
+        size = max(0, min(size, len(self)))
+        if size == len(self):
+            return
+        del self._indexes[size:]
+        del self._timestamps[size:]
+        del self._hashes[size * DIGEST_SIZE:]
+        del self._previous_hashes[size * DIGEST_SIZE:]
+        cut = self._offsets[size]
+        if cut >= self._base_size:
+            del self._payload[cut - self._base_size:]
+        else:
+            # Cutting into the mapped snapshot: keep the surviving part in memory instead
+            self._payload = bytearray(self._base[:cut])
+            self._base = memoryview(b'')
+            self._base_size = 0
+        del self._offsets[size + 1:]
+        del self._op_offsets[size:]
+        for odd in (self._odd_timestamps, self._odd_hashes, self._odd_previous_hashes):
+            for pos in [p for p in odd if p >= size]:
+                del odd[pos]
+
+    def clear(self):
+        self.truncate(0)
+
+    def append_store(self, other):
+        """Append every block of another ChainStore without decoding them"""
+        first = len(self)
+        shift = self._base_size + len(self._payload)
+        self._indexes.extend(other._indexes)
+        self._timestamps.extend(other._timestamps)
+        self._hashes += other._hashes
+        self._previous_hashes += other._previous_hashes
+        self._payload += other._payload_bytes(0, other._offsets[-1])
+        self._offsets.extend(offset + shift for offset in other._offsets[1:])
+        self._op_offsets.extend(offset + shift for offset in other._op_offsets)
+        for name in ('_odd_timestamps', '_odd_hashes', '_odd_previous_hashes'):
+            getattr(self, name).update({first + pos: value for pos, value in getattr(other, name).items()})
+
+    def segment(self, start, stop):
+        """Independent copy of positions start..stop-1, e.g. to hand to a worker process"""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        part = ChainStore()
+        part._indexes = self._indexes[start:stop]
+        part._timestamps = self._timestamps[start:stop]
+        part._hashes = self._hashes[start * DIGEST_SIZE:stop * DIGEST_SIZE]
+        part._previous_hashes = self._previous_hashes[start * DIGEST_SIZE:stop * DIGEST_SIZE]
+
+        first = self._offsets[start]
+        part._payload = bytearray(self._payload_bytes(first, self._offsets[stop]))
+        part._offsets = array('Q', (offset - first for offset in self._offsets[start:stop + 1]))
+        part._op_offsets = array('Q', (offset - first for offset in self._op_offsets[start:stop]))
+
+        for name in ('_odd_timestamps', '_odd_hashes', '_odd_previous_hashes'):
+            setattr(part, name, {pos - start: value for pos, value in getattr(self, name).items()
+                                 if start <= pos < stop})
+        return part
+
+    @staticmethod
+    def _append_digest(buffer, odd, pos, value):
+        digest = _encode_digest(value)
+        if digest is None:
+            odd[pos] = value
+            digest = bytes(DIGEST_SIZE)
+        buffer += digest
+
+    # Field accessors (positions are 0-based, negatives allowed)
+
+    def index_at(self, pos):
+        return self._indexes[pos]
+
+    def timestamp_at(self, pos):
+        pos = self._position(pos)
+        if pos in self._odd_timestamps:
+            return self._odd_timestamps[pos]
+        return _decode_timestamp(self._timestamps[pos])
+
+    def digest_at(self, pos):
+        """Raw 32-byte block hash (zero bytes for non-SHA-256 hashes)"""
+        pos = self._position(pos)
+        return bytes(self._hashes[pos * DIGEST_SIZE:(pos + 1) * DIGEST_SIZE])
+
+    def hash_at(self, pos):
+        pos = self._position(pos)
+        if pos in self._odd_hashes:
+            return self._odd_hashes[pos]
+        return self._hashes[pos * DIGEST_SIZE:(pos + 1) * DIGEST_SIZE].hex()
+
+    def previous_hash_at(self, pos):
+        pos = self._position(pos)
+        if pos in self._odd_previous_hashes:
+            return self._odd_previous_hashes[pos]
+        return self._previous_hashes[pos * DIGEST_SIZE:(pos + 1) * DIGEST_SIZE].hex()
+
+    def _payload_bytes(self, start, end):
+        base_size = self._base_size
+        if end <= base_size:
+            return bytes(self._base[start:end])
+        if start >= base_size:
+            return bytes(self._payload[start - base_size:end - base_size])
+        return bytes(self._base[start:]) + bytes(self._payload[:end - base_size])
+
+    def _data_bytes(self, pos):
+        pos = self._position(pos)
+        raw = self._payload_bytes(self._offsets[pos], self._op_offsets[pos])
+        return raw[0], raw[1:]
+
+    def data_at(self, pos):
+        """Decode a block's data (dict for records, str for the genesis block)"""
+        tag, raw = self._data_bytes(pos)
+        if tag == TAG_STR:
+            return raw.decode('utf-8')
+        return json.loads(raw)
+
+    def hash_input_at(self, pos):
+        """Canonical data string for hashing, without decoding JSON objects"""
+        tag, raw = self._data_bytes(pos)
+        if tag in (TAG_JSON, TAG_MERKLE):
+            return canonical_data(json.loads(raw))
+        return raw.decode('utf-8')
+
+    def is_merkle_at(self, pos):
+        """Whether the block carries a Merkle root over several records"""
+        return self._data_bytes(pos)[0] == TAG_MERKLE
+
+    def sql_operation_at(self, pos):
+        pos = self._position(pos)
+        raw = self._payload_bytes(self._op_offsets[pos], self._offsets[pos + 1])
+        return raw.decode('utf-8') if raw else None
+
+    def block_nbytes(self, pos):
+        """Bytes one block takes in the packed arrays and payload buffer"""
+        pos = self._position(pos)
+        return BLOCK_ARRAY_BYTES + self._offsets[pos + 1] - self._offsets[pos]
+
+    def nbytes(self):
+        """Approximate memory held by the packed arrays and payload buffer"""
+        return (
+            self._indexes.itemsize * len(self._indexes)
+            + self._timestamps.itemsize * len(self._timestamps)
+            + len(self._hashes) + len(self._previous_hashes) + self._base_size + len(self._payload)
+            + self._offsets.itemsize * len(self._offsets)
+            + self._op_offsets.itemsize * len(self._op_offsets)
+        )
+
+    # Snapshots
+
+    def save(self, path, meta=None):
+        """Write the store to a binary snapshot file (atomically replaced)"""
+        meta = dict(meta or {})
+        meta.update({
+            'byteorder': sys.byteorder,
+            'odd_timestamps': {str(pos): value for pos, value in self._odd_timestamps.items()},
+            'odd_hashes': {str(pos): value for pos, value in self._odd_hashes.items()},
+            'odd_previous_hashes': {str(pos): value for pos, value in self._odd_previous_hashes.items()}
+        })
+        meta_bytes = json.dumps(meta).encode('utf-8')
+        payload_size = self._base_size + len(self._payload)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        was_mapped = self._mmap is not None
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(self), payload_size, len(meta_bytes)))
+                f.write(meta_bytes)
+                f.write(b'\0' * (-f.tell() % 8))
+                for part in (self._indexes, self._timestamps, self._hashes, self._previous_hashes,
+                             self._offsets, self._op_offsets):
+                    f.write(part)
+                payload_start = f.tell()
+                f.write(self._base)
+                f.write(self._payload)
+                f.flush()
+                os.fsync(f.fileno())
+            # Windows will not replace a file that is still mapped, and the mapping may be of path
+            self._release_mapping()
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        if was_mapped:
+            self._map_payload(path, payload_start, payload_size)
+
+    def _release_mapping(self):
+        """Copy the memory-mapped snapshot bytes into _payload and close the mapping"""
+        if self._mmap is None:
+            return
+        base = self._base
+        self._payload = bytearray(base) + self._payload
+        self._base_size = 0
+        self._base = memoryview(b'')
+        base.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # A reader still holds a slice; the map closes once it is garbage collected
+        self._mmap = None
+
+    def _map_payload(self, path, start, size):
+        """Serve the first size payload bytes from path (at offset start) instead of memory"""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._base = memoryview(mapped)[start:start + size]
+        self._base_size = size
+        self._payload = self._payload[size:]
+        self._mmap = mapped
+
+    @classmethod
+    def load(cls, path):
+        """Open a snapshot written by save(); returns (store, meta).
+
+        Fixed-size arrays are copied into memory; the payload buffer stays
+        memory-mapped and is only paged in as blocks are read.
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+
+        magic, version, count, payload_size, meta_size = SNAPSHOT_HEADER.unpack_from(view, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} chain snapshot")
+        position = SNAPSHOT_HEADER.size
+        meta = json.loads(bytes(view[position:position + meta_size]))
+        if meta.get('byteorder') != sys.byteorder:
+            raise ValueError(f"{path} was written on a {meta.get('byteorder')}-endian machine")
+        position += meta_size
+        position += -position % 8
+
+        store = cls()
+
+        def take(size):
+            nonlocal position
+            part = view[position:position + size]
+            if len(part) != size:
+                raise ValueError(f"{path} is truncated")
+            position += size
+            return part
+
+        store._indexes.frombytes(take(8 * count))
+        store._timestamps.frombytes(take(8 * count))
+        store._hashes += take(DIGEST_SIZE * count)
+        store._previous_hashes += take(DIGEST_SIZE * count)
+        store._offsets = array('Q')
+        store._offsets.frombytes(take(8 * (count + 1)))
+        store._op_offsets.frombytes(take(8 * count))
+        store._base = take(payload_size)
+        store._base_size = payload_size
+        store._mmap = mapped
+
+        store._odd_timestamps = {int(pos): value for pos, value in meta.pop('odd_timestamps').items()}
+        store._odd_hashes = {int(pos): value for pos, value in meta.pop('odd_hashes').items()}
+        store._odd_previous_hashes = {int(pos): value for pos, value in meta.pop('odd_previous_hashes').items()}
+        return store, meta
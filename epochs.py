@@ -0,0 +1,242 @@
+import hashlib
+import json
+from bisect import bisect_left
+from collections import OrderedDict
+
+from chain_store import ChainStore, BlockView
+from merkle import merkle_root
+
+SEAL_OPERATION = 'EPOCH_SEAL'
+
+
+def epoch_root(chain, first, last):
+    """Merkle root over the hashes of blocks first..last"""
+    return merkle_root([chain.hash_at(pos) for pos in range(first, last + 1)])
+
+
+def state_root(state):
+    """Digest of a table state (sql_id -> row list from time_travel), independent of row order"""
+    rows = sorted(state.values(), key=lambda row: row[0])
+    return hashlib.sha256(json.dumps(rows, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def is_seal(sql_operation):
+    return bool(sql_operation) and sql_operation.startswith(SEAL_OPERATION)
+
+
+def check_seals(chain):
+    """Check every EPOCH_SEAL block against the epoch it closes; returns (position, problem) pairs"""
+    problems = []
+    previous_seal = -1
+    for pos in range(len(chain)):
+        if not is_seal(chain.sql_operation_at(pos)):
+            continue
+        data = chain.data_at(pos)
+        first, last = previous_seal + 1, pos - 1
+        if data.get('first_index') != first or data.get('last_index') != last:
+            problems.append((pos, "seal does not cover the blocks since the previous seal"))
+        elif data.get('epoch_root') != epoch_root(chain, first, last):
+            problems.append((pos, "epoch root does not match the sealed blocks"))
+        previous_seal = pos
+    return problems
+
+
+class EpochedChain:
+    """List-like chain that keeps only the current epoch in memory.
+
+    An EPOCH_SEAL block closes each epoch. Everything from the last seal
+    onwards (the tail) is resident; older epochs are fetched with
+    loader(start, stop) on first access and kept in a small LRU. A fetched
+    epoch must end in the seal hash seen when it was appended and start
+    with a link to the seal before it, so linkage holds across boundaries.
+    Positions and accessors match ChainStore.
+    """
+
+    def __init__(self, loader=None, max_cached_epochs=2):
+        self.tail = ChainStore()
+        self.tail_start = 0
+        self.seals = []
+        self.seal_hashes = []
+        self.loader = loader
+        self.max_cached_epochs = max_cached_epochs
+        self._epochs = OrderedDict()
+
+    # List-like behaviour
+
+    def __len__(self):
+        return self.tail_start + len(self.tail)
+
+    def __iter__(self):
+        for pos in range(len(self)):
+            yield BlockView(self, pos)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [BlockView(self, pos) for pos in range(*key.indices(len(self)))]
+        return BlockView(self, self._normalize(key))
+
+    def __delitem__(self, key):
+        if not isinstance(key, slice) or key.step not in (None, 1) or key.stop not in (None, len(self)):
+            raise TypeError("EpochedChain only supports deleting a tail slice")
+        self.truncate(key.indices(len(self))[0])
+
+    def __repr__(self):
+        return f"EpochedChain({len(self)} blocks, {len(self.seals)} sealed epochs, {len(self.tail)} resident)"
+
+    def _normalize(self, pos):
+        size = len(self)
+        if pos < 0:
+            pos += size
+        if not 0 <= pos < size:
+            raise IndexError("chain index out of range")
+        return pos
+
+    def append(self, block):
+        pos = len(self)
+        self.tail.append(block)
+        if is_seal(block.get('sql_operation')):
+            if not self.seals or self.seals[-1] < pos:
+                self.seals.append(pos)
+                self.seal_hashes.append(block['hash'])
+            if pos > self.tail_start:
+                # The epoch is closed: keep only its seal resident
+                self.tail = self.tail.segment(pos - self.tail_start, pos - self.tail_start + 1)
+                self.tail_start = pos
+
+    def extend(self, blocks):
+        for block in blocks:
+            self.append(block)
+
+    def start_at_seals(self, seals):
+        """Make an empty chain resume at the last of the given (index, hash) seals"""
+        self.clear()
+        self.seals = [index for index, _ in seals]
+        self.seal_hashes = [block_hash for _, block_hash in seals]
+        self.tail_start = self.seals[-1] if self.seals else 0
+
+    def truncate(self, size):
+        size = max(0, min(size, len(self)))
+        if size > self.tail_start or size == len(self):
+            self.tail.truncate(size - self.tail_start)
+        else:
+            # Cutting into a sealed epoch reopens it as the tail
+            keep = bisect_left(self.seals, size)
+            del self.seals[keep:]
+            del self.seal_hashes[keep:]
+            self.tail_start = self.seals[-1] if self.seals else 0
+            self.tail = self.loader(self.tail_start, size) if size > self.tail_start else ChainStore()
+        for start, stop in [key for key in self._epochs if key[1] > size]:
+            del self._epochs[(start, stop)]
+
+    def clear(self):
+        self.tail = ChainStore()
+        self.tail_start = 0
+        self.seals = []
+        self.seal_hashes = []
+        self._epochs.clear()
+
+    # Sealed epochs
+
+    def _locate(self, pos):
+        """(store, position within it) holding chain position pos"""
+        pos = self._normalize(pos)
+        if pos >= self.tail_start:
+            return self.tail, pos - self.tail_start
+        epoch = bisect_left(self.seals, pos)
+        start = self.seals[epoch - 1] + 1 if epoch else 0
+        return self._epoch(epoch, start, self.seals[epoch] + 1), pos - start
+
+    def _epoch(self, epoch, start, stop):
+        key = (start, stop)
+        store = self._epochs.get(key)
+        if store is not None:
+            self._epochs.move_to_end(key)
+            return store
+
+        store = self.loader(start, stop)
+        if len(store) != stop - start or store.hash_at(-1) != self.seal_hashes[epoch]:
+            raise ValueError(f"Epoch {epoch} (blocks {start}-{stop - 1}) does not end in its seal")
+        if epoch and store.previous_hash_at(0) != self.seal_hashes[epoch - 1]:
+            raise ValueError(f"Epoch {epoch} does not link to the seal of epoch {epoch - 1}")
+        if store.data_at(-1).get('epoch_root') != epoch_root(store, 0, len(store) - 2):
+            raise ValueError(f"Epoch {epoch} blocks do not match the epoch root in its seal")
+
+        self._epochs[key] = store
+        while len(self._epochs) > self.max_cached_epochs:
+            self._epochs.popitem(last=False)
+        return store
+
+    # Field accessors, as on ChainStore
+
+    def index_at(self, pos):
+        store, local = self._locate(pos)
+        return store.index_at(local)
+
+    def timestamp_at(self, pos):
+        store, local = self._locate(pos)
+        return store.timestamp_at(local)
+
+    def digest_at(self, pos):
+        store, local = self._locate(pos)
+        return store.digest_at(local)
+
+    def hash_at(self, pos):
+        store, local = self._locate(pos)
+        return store.hash_at(local)
+
+    def previous_hash_at(self, pos):
+        store, local = self._locate(pos)
+        return store.previous_hash_at(local)
+
+    def data_at(self, pos):
+        store, local = self._locate(pos)
+        return store.data_at(local)
+
+    def hash_input_at(self, pos):
+        store, local = self._locate(pos)
+        return store.hash_input_at(local)
+
+    def is_merkle_at(self, pos):
+        store, local = self._locate(pos)
+        return store.is_merkle_at(local)
+
+    def sql_operation_at(self, pos):
+        store, local = self._locate(pos)
+        return store.sql_operation_at(local)
+
+    def block_nbytes(self, pos):
+        store, local = self._locate(pos)
+        return store.block_nbytes(local)
+
+    def nbytes(self):
+        """Memory held by the resident tail and the cached epochs"""
+        return self.tail.nbytes() + sum(store.nbytes() for store in self._epochs.values())
+
+    def segment(self, start, stop):
+        """Independent ChainStore copy of positions start..stop-1, fetching sealed epochs as needed"""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        part = ChainStore()
+        pos = start
+        while pos < stop:
+            store, local = self._locate(pos)
+            count = min(stop - pos, len(store) - local)
+            part.append_store(store.segment(local, local + count))
+            pos += count
+        return part
+
+    # Snapshots (only the resident tail is written)
+
+    def save(self, path, meta=None):
+        meta = dict(meta or {})
+        meta.update({'tail_start': self.tail_start, 'seals': self.seals, 'seal_hashes': self.seal_hashes})
+        self.tail.save(path, meta)
+
+    @classmethod
+    def load(cls, path, loader=None):
+        tail, meta = ChainStore.load(path)
+        chain = cls(loader)
+        chain.tail = tail
+        chain.tail_start = meta.pop('tail_start', 0)
+        chain.seals = meta.pop('seals', [])
+        chain.seal_hashes = meta.pop('seal_hashes', [])
+        return chain, meta
@@ -0,0 +1,85 @@
+import json
+import hashlib
+from chain_store import canonical_data, hash_block
+
+# Domain separation so a leaf can never be passed off as an inner node
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+def leaf_hash(record):
+    """Digest of one record as a Merkle leaf"""
+    record_str = json.dumps(record, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(LEAF_PREFIX + record_str.encode('utf-8')).digest()
+
+
+def _node_hash(left, right):
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _next_level(level):
+    # An odd node out is promoted unchanged rather than duplicated
+    parents = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(records):
+    """Hex Merkle root over records, in order"""
+    level = [leaf_hash(record) for record in records]
+    if not level:
+        return hashlib.sha256(b'').hexdigest()
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0].hex()
+
+
+def merkle_proof(records, position):
+    """Sibling path from records[position] up to the root as [side, hex] pairs"""
+    level = [leaf_hash(record) for record in records]
+    proof = []
+    while len(level) > 1:
+        sibling = position ^ 1
+        if sibling < len(level):
+            proof.append(['L' if sibling < position else 'R', level[sibling].hex()])
+        level = _next_level(level)
+        position //= 2
+    return proof
+
+
+def root_from_proof(record, proof):
+    """Recompute the Merkle root implied by a record and its proof"""
+    digest = leaf_hash(record)
+    for side, sibling in proof:
+        sibling = bytes.fromhex(sibling)
+        digest = _node_hash(sibling, digest) if side == 'L' else _node_hash(digest, sibling)
+    return digest.hex()
+
+
+def records_match_root(data):
+    """Check a Merkle block's records against the root its hash commits to"""
+    if not isinstance(data, dict) or 'merkle_root' not in data:
+        return True
+    return merkle_root(data.get('records', [])) == data['merkle_root']
+
+
+def verify_inclusion_proof(proof):
+    """Check a proof from BlockchainSupabaseDB.get_inclusion_proof.
+
+    Costs O(log n) hashes for the record plus one block hash; the block's
+    other records are never needed.
+    """
+    block = proof['block']
+    if proof['merkle_root'] is None:
+        # Single-record block: the record is the block data itself
+        header = proof['record']
+    else:
+        if root_from_proof(proof['record'], proof['proof']) != proof['merkle_root']:
+            return False
+        header = block['header']
+        if header.get('merkle_root') != proof['merkle_root']:
+            return False
+
+    expected_hash = hash_block(block['index'], block['timestamp'], canonical_data(header), block['previous_hash'])
+    return expected_hash == block['hash']
@@ -0,0 +1,180 @@
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds in seconds, Prometheus-style (+Inf is implicit)
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram.
+
+    Updates are plain integer increments without a lock; under heavy
+    contention an observation can occasionally be lost, which keeps the
+    hot path to a bisect and three additions.
+    """
+
+    __slots__ = ('name', 'labels', 'bucket_counts', 'count', 'sum', 'errors')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.bucket_counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+
+    def observe(self, seconds):
+        self.bucket_counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def percentile(self, fraction):
+        """Bucket upper bound containing the given fraction of observations"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for bound, bucket_count in zip(BUCKETS + (float('inf'),), self.bucket_counts):
+            seen += bucket_count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+
+class MetricsRegistry:
+    """Process-wide collection of timing histograms"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(name, key[1]))
+        return histogram
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time a block of code into the histogram name{labels}"""
+        histogram = self.histogram(name, **labels)
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            histogram.errors += 1
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    def timed(self, func, name, **labels):
+        """Wrap func so every call is timed into name{labels}"""
+        histogram = self.histogram(name, **labels)
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                histogram.errors += 1
+                raise
+            finally:
+                histogram.observe(perf_counter() - started)
+
+        return wrapper
+
+    def instrument(self, name, include_private=True, **labels):
+        """Class decorator timing every method defined on the class.
+
+        Each method gets its own histogram, labelled method=<name>. Generator
+        functions are left alone since their cost lands in the caller's loop.
+        """
+        def decorate(cls):
+            for attr, value in list(vars(cls).items()):
+                if not inspect.isfunction(value) or inspect.isgeneratorfunction(value):
+                    continue
+                if attr.startswith('__') and attr != '__init__':
+                    continue
+                if attr.startswith('_') and not attr.startswith('__') and not include_private:
+                    continue
+                method = attr.strip('_') if attr == '__init__' else attr
+                setattr(cls, attr, self.timed(value, name, method=method, **labels))
+            return cls
+
+        return decorate
+
+    def snapshot(self):
+        """One summary dict per histogram"""
+        rows = []
+        for histogram in list(self._histograms.values()):
+            row = dict(histogram.labels)
+            row.update({
+                'metric': histogram.name,
+                'call': histogram.name + _labels(histogram.labels),
+                'count': histogram.count,
+                'errors': histogram.errors,
+                'total_ms': histogram.sum * 1000,
+                'mean_ms': histogram.sum / histogram.count * 1000 if histogram.count else 0.0,
+                'p50_ms': _to_ms(histogram.percentile(0.50)),
+                'p99_ms': _to_ms(histogram.percentile(0.99))
+            })
+            rows.append(row)
+        return rows
+
+    def to_prometheus(self):
+        """Prometheus text exposition format"""
+        lines = []
+        by_name = {}
+        for histogram in list(self._histograms.values()):
+            by_name.setdefault(histogram.name, []).append(histogram)
+
+        for name in sorted(by_name):
+            lines.append(f"# TYPE {name} histogram")
+            for histogram in by_name[name]:
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS + (float('inf'),), histogram.bucket_counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float('inf') else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(histogram.labels, le=le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(histogram.labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_labels(histogram.labels)} {histogram.count}")
+
+            errors_name = name.replace('_seconds', '') + '_errors_total'
+            lines.append(f"# TYPE {errors_name} counter")
+            for histogram in by_name[name]:
+                lines.append(f"{errors_name}{_labels(histogram.labels)} {histogram.errors}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Zero every histogram (the instrumented wrappers keep their references)"""
+        for histogram in list(self._histograms.values()):
+            histogram.bucket_counts = [0] * (len(BUCKETS) + 1)
+            histogram.count = 0
+            histogram.sum = 0.0
+            histogram.errors = 0
+
+
+def _to_ms(seconds):
+    if seconds is None:
+        return None
+    return seconds * 1000 if seconds != float('inf') else float('inf')
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+
+
+class TipCache:
+    """Bounded LRU read-through cache keyed by query and chain tip hash.
+
+    Every mutation appends a block, so an entry cached under an older tip
+    can never be hit again; invalidate() just frees those entries early.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, tip_hash, key, loader):
+        """Return the cached value for (key, tip_hash), calling loader() on a miss"""
+        cache_key = (key, tip_hash)
+        with self._lock:
+            if cache_key in self._entries:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return self._entries[cache_key]
+            self.misses += 1
+
+        # Load outside the lock so one slow query does not block every reader
+        value = loader()
+
+        with self._lock:
+            self._entries[cache_key] = value
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries
+            }
@@ -0,0 +1,209 @@
+"""Read-only HTTP API over BlockchainSupabaseDB for downstream systems.
+
+Every response is JSON lines (application/x-ndjson), streamed page by
+page, and carries the chain tip it was served at as its ETag. Every write
+appends a block, so a client that sends If-None-Match with that ETag gets
+a bodiless 304 until something changes, and can then ask only for the
+blocks after the last one it has:
+
+    python -m read_api --sqlite blockchain.db --port 8502
+
+    GET /tip                          chain tip index and hash
+    GET /grades?subject=Math&sort=grade&desc=1&page_size=500
+                                      verified grades (filters: student_id,
+                                      subject, grade, semester)
+    GET /students/<student_id>/grades   one student's verified grades
+    GET /students/<student_id>/history  every block touching the student
+    GET /blocks?after=<index>&limit=1000  blocks after a known index
+    GET /verify                       incremental chain verification status
+
+Backend errors are answered with 500 and no ETag. A page that fails after
+the 200 went out ends the body with an {"error": ...} line.
+"""
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from storage import GRID_SORT_COLUMNS
+
+API_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 5000
+
+
+class BadRequest(Exception):
+    """Invalid query parameter; answered with 400"""
+
+
+class ReadAPIHandler(BaseHTTPRequestHandler):
+    """Routes GET requests to the BlockchainSupabaseDB on self.server.db"""
+
+    server_version = "BlockchainReadAPI/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+
+        if parts == ["tip"]:
+            route = self.tip
+        elif parts == ["grades"]:
+            route = self.grades
+        elif len(parts) == 3 and parts[0] == "students" and parts[2] == "grades":
+            route = lambda tip: self.grades(tip, student_id=parts[1])
+        elif len(parts) == 3 and parts[0] == "students" and parts[2] == "history":
+            route = lambda tip: self.history(tip, parts[1])
+        elif parts == ["blocks"]:
+            route = self.blocks
+        elif parts == ["verify"]:
+            route = self.verify
+        else:
+            return self._send_error(404, f"no such resource: {url.path}")
+
+        db = self.server.db
+        db.sync_tail()  # Pick up blocks other processes wrote (rate-limited)
+        tip = len(db.chain) - 1
+        etag = f'"{db.chain.hash_at(tip) if tip >= 0 else "0"}"'
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        try:
+            lines = route(tip)
+            first = next(lines, None)  # Surface errors before the 200 and its ETag go out
+        except BadRequest as e:
+            return self._send_error(400, str(e))
+        except Exception as e:
+            self.log_error("%s failed: %r", url.path, e)
+            return self._send_error(500, f"backend error: {e}")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("ETag", etag)
+        self.send_header("X-Chain-Tip", str(tip))
+        self.end_headers()
+        if first is None:
+            return
+        self._write(first)
+        try:
+            for line in lines:
+                self._write(line)
+        except ConnectionError:
+            pass  # The client hung up
+        except Exception as e:
+            # Too late for a status code: end the body with an error line instead
+            self.log_error("%s failed mid-stream: %r", url.path, e)
+            self._write({'error': f"backend error: {e}"})
+
+    def _write(self, item):
+        self.wfile.write(json.dumps(item, default=str).encode("utf-8") + b"\n")
+
+    def _send_error(self, status, message):
+        body = json.dumps({'error': message}).encode("utf-8") + b"\n"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _int(self, name, default, minimum=0, maximum=None):
+        try:
+            value = int(self.query.get(name, default))
+        except ValueError:
+            raise BadRequest(f"{name} must be an integer")
+        if value < minimum:
+            raise BadRequest(f"{name} must be at least {minimum}")
+        if maximum is not None and value > maximum:
+            raise BadRequest(f"{name} must be at most {maximum}")
+        return value
+
+    # Routes: generators of JSON-serializable lines, given the tip the ETag was taken at
+
+    def tip(self, tip):
+        db = self.server.db
+        yield {'tip_index': tip, 'tip_hash': db.chain.hash_at(tip) if tip >= 0 else "0", 'blocks': len(db.chain)}
+
+    def grades(self, tip, student_id=None):
+        sort = self.query.get("sort", "id")
+        if sort not in GRID_SORT_COLUMNS:
+            raise BadRequest(f"sort must be one of {', '.join(GRID_SORT_COLUMNS)}")
+        descending = self.query.get("desc", "0") not in ("0", "false", "")
+        page_size = self._int("page_size", API_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        filters = {column: self.query.get(column) for column in ("student_id", "subject", "grade", "semester")}
+        if student_id is not None:
+            filters['student_id'] = student_id
+        return self._grade_lines(sort, descending, page_size, filters)
+
+    def _grade_lines(self, sort, descending, page_size, filters):
+        for rows in self.server.db.iter_grade_grid_pages(sort, descending, page_size, **filters):
+            yield from rows
+
+    def history(self, tip, student_id):
+        yield from self.server.db.query_history(student_id=student_id).to_dict("records")
+
+    def blocks(self, tip):
+        after = self._int("after", -1, minimum=-1)
+        limit = self._int("limit", API_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        return self._block_lines(after, min(tip, after + limit))
+
+    def _block_lines(self, after, last):
+        chain = self.server.db.chain
+        for pos in range(after + 1, last + 1):
+            yield dict(chain[pos])
+
+    def verify(self, tip):
+        db = self.server.db
+        is_valid, message = db.verify_blockchain_integrity()
+        checkpoint = db.checkpoint
+        yield {
+            'valid': is_valid,
+            'message': message,
+            'tip_index': tip,
+            'last_checkpoint': checkpoint['block_index'] if checkpoint else None
+        }
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def log_error(self, format, *args):
+        super().log_message(format, *args)  # Logged even without --verbose
+
+
+def make_server(db, host="127.0.0.1", port=8502, verbose=False):
+    """ThreadingHTTPServer serving db; call serve_forever() on it"""
+    server = ThreadingHTTPServer((host, port), ReadAPIHandler)
+    server.db = db
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    from blockchain_supabase import BlockchainSupabaseDB, add_backend_arguments, backend_from_args
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_backend_arguments(parser)
+    parser.add_argument("--snapshot", help="local chain snapshot to start from")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    backend = backend_from_args(parser, args)
+
+    server = make_server(BlockchainSupabaseDB(backend, snapshot_path=args.snapshot), args.host, args.port, args.verbose)
+    print(f"Serving on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
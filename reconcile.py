@@ -0,0 +1,130 @@
+import hashlib
+import json
+
+# student_grades columns the chain records, in digest order
+TRACKED_COLUMNS = ("student_name", "student_id", "subject", "grade", "semester", "remarks", "is_verified")
+
+
+def tracked_values(row):
+    """Tracked columns of a grade row, normalized so chain and table values compare equal"""
+    return [bool(row.get(column)) if column == 'is_verified' else str(row.get(column) or "")
+            for column in TRACKED_COLUMNS]
+
+
+def row_digest(row):
+    """16-byte digest of the tracked columns of a grade row"""
+    return hashlib.blake2b(json.dumps(tracked_values(row)).encode('utf-8'), digest_size=16).digest()
+
+
+def block_changes(chain, pos):
+    """Row changes a block made: ('INSERT', sql_id, record) or ('DELETE', sql_id, reason)"""
+    sql_operation = chain.sql_operation_at(pos) or ''
+    if sql_operation.startswith('BULK_INSERT'):
+        for record in chain.data_at(pos).get('records', []):
+            yield 'INSERT', record['sql_id'], record
+    elif sql_operation.startswith('INSERT'):
+        data = chain.data_at(pos)
+        yield 'INSERT', data['sql_id'], data
+    elif sql_operation.startswith('DELETE'):
+        data = chain.data_at(pos)
+        yield 'DELETE', data.get('sql_id'), data.get('reason')
+
+
+class LedgerReconciler:
+    """Expected student_grades state replayed from the chain.
+
+    For every sql_id the chain inserted it keeps the digest of the row as the
+    chain says it should look, plus the positions of its INSERT (or
+    BULK_INSERT) and DELETE blocks so drifted fields can be explained.
+    Replay is incremental: only blocks after the last replayed one are read,
+    unless the chain was truncated or replaced underneath.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.expected = {}
+        self.position = 0
+        self._last_hash = None
+
+    def replay(self, chain):
+        """Apply the blocks appended since the last replay; returns how many were read"""
+        if self.position and (self.position > len(chain) or chain.hash_at(self.position - 1) != self._last_hash):
+            self.reset()
+
+        start, stop = self.position, len(chain)
+        for pos in range(start, stop):
+            for change, sql_id, value in block_changes(chain, pos):
+                if change == 'INSERT':
+                    self.expected[sql_id] = (row_digest(dict(value, is_verified=True)), pos, None)
+                elif sql_id in self.expected:
+                    _, insert_pos, _ = self.expected[sql_id]
+                    row = self.expected_row(chain, sql_id, insert_pos, pos)
+                    self.expected[sql_id] = (row_digest(row), insert_pos, pos)
+
+        if stop > start:
+            self.position = stop
+            self._last_hash = chain.hash_at(stop - 1)
+        return stop - start
+
+    @staticmethod
+    def expected_row(chain, sql_id, insert_pos, delete_pos=None):
+        """Tracked columns of a row as the chain recorded it"""
+        data = chain.data_at(insert_pos)
+        if 'records' in data:
+            data = next(record for record in data['records'] if record.get('sql_id') == sql_id)
+        row = {column: data.get(column) for column in TRACKED_COLUMNS}
+        row['is_verified'] = True
+        if delete_pos is not None:
+            row['is_verified'] = False
+            row['remarks'] = f"Deleted: {chain.data_at(delete_pos).get('reason')}"
+        return row
+
+    def compare(self, chain, pages):
+        """Hash-join live rows (an iterable of row pages) against the expected state.
+
+        Returns one dict per drifted row: 'modified' rows whose tracked
+        columns differ, 'missing' rows the chain has but the table does not,
+        and 'unexpected' rows the chain never recorded.
+        """
+        drift = []
+        seen = set()
+        for page in pages:
+            for row in page:
+                seen.add(row['id'])
+                issue = self._check_row(chain, row)
+                if issue:
+                    drift.append(issue)
+
+        for record_id, (_, insert_pos, delete_pos) in self.expected.items():
+            if record_id not in seen:
+                drift.append(self._drift(record_id, 'missing', delete_pos or insert_pos, "row is gone from the table"))
+
+        drift.sort(key=lambda item: item['id'])
+        return drift
+
+    def recheck(self, chain, drift):
+        """Drop drift entries whose live row matches the state after a later replay"""
+        return [item for item in drift if item['row'] is None or self._check_row(chain, item['row'])]
+
+    def _check_row(self, chain, row):
+        record_id = row['id']
+        expected = self.expected.get(record_id)
+        if expected is None:
+            return self._drift(record_id, 'unexpected', None, "not recorded on the chain", row)
+        if row_digest(row) == expected[0]:
+            return None
+
+        _, insert_pos, delete_pos = expected
+        recorded = self.expected_row(chain, record_id, insert_pos, delete_pos)
+        changes = ", ".join(
+            f"{column}: {old!r} → {new!r}"
+            for column, old, new in zip(TRACKED_COLUMNS, tracked_values(recorded), tracked_values(row))
+            if old != new
+        )
+        return self._drift(record_id, 'modified', delete_pos or insert_pos, changes, row)
+
+    @staticmethod
+    def _drift(record_id, issue, block, details, row=None):
+        return {'id': record_id, 'issue': issue, 'block': block, 'details': details, 'row': row}
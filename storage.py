@@ -0,0 +1,632 @@
+import sqlite3
+import threading
+from datetime import datetime
+from supabase import create_client, Client
+from postgrest.exceptions import APIError
+from metrics import REGISTRY
+
+SEARCH_COLUMNS = ("student_name", "student_id", "subject")
+# NOT NULL columns grade grids can sort by; id breaks ties so keyset cursors are unique
+GRID_SORT_COLUMNS = ("id", "student_name", "student_id", "subject", "grade", "created_at")
+
+
+class BlockConflictError(Exception):
+    """Another writer already stored a block at that block_index or on that parent, or the parent is gone"""
+
+
+class StorageBackend:
+    """Storage interface for the student_grades and blockchain_log tables"""
+
+    def insert_grade(self, record):
+        """Insert a grade row and return it with its generated id"""
+        raise NotImplementedError
+
+    def insert_grades(self, records):
+        """Insert many grade rows in one request and return them with ids, in order"""
+        raise NotImplementedError
+
+    def delete_grades(self, record_ids):
+        """Physically remove the given grade rows"""
+        raise NotImplementedError
+
+    def update_grade(self, record_id, fields):
+        """Update the given columns of one grade row"""
+        raise NotImplementedError
+
+    def update_grades(self, record_ids, fields):
+        """Set the same column values on many grade rows in one request"""
+        raise NotImplementedError
+
+    def select_grades(self, **filters):
+        """Return grade rows matching all equality filters"""
+        raise NotImplementedError
+
+    def select_grades_by_ids(self, record_ids):
+        """Return the grade rows with the given ids, in id order"""
+        raise NotImplementedError
+
+    def count_grades(self, **filters):
+        """Number of grade rows matching all equality filters, without fetching them"""
+        raise NotImplementedError
+
+    def select_grade_page(self, after_id=0, limit=1000):
+        """Return up to limit grade rows with id > after_id, in id order"""
+        raise NotImplementedError
+
+    def select_grade_grid(self, sort="id", descending=False, after=None, limit=50, **filters):
+        """One page of grade rows matching all equality filters, ordered by (sort, id).
+
+        Keyset pagination: after is the (sort value, id) of the last row of the
+        previous page, so every page costs the same however deep it is.
+        """
+        raise NotImplementedError
+
+    def search_grades(self, term, limit=100):
+        """Verified rows whose name, student ID or subject contains term (case-insensitive)"""
+        raise NotImplementedError
+
+    def delete_all_grades(self):
+        """Remove every grade row"""
+        raise NotImplementedError
+
+    def insert_block(self, row):
+        """Insert one blockchain_log row"""
+        raise NotImplementedError
+
+    def insert_blocks(self, rows):
+        """Insert many blockchain_log rows in one request.
+
+        Raises BlockConflictError, storing nothing, if a row's block_index or
+        previous_hash is taken or its previous_hash is not the hash of the
+        stored block at block_index - 1.
+        """
+        raise NotImplementedError
+
+    def select_blocks(self, after_index=-1, limit=1000):
+        """Return up to limit blockchain_log rows with block_index > after_index, in order"""
+        raise NotImplementedError
+
+    def select_operation_blocks(self, prefix):
+        """Return the blockchain_log rows whose sql_operation starts with prefix, in block order"""
+        raise NotImplementedError
+
+    def select_seal_blocks(self):
+        """Return every EPOCH_SEAL blockchain_log row, in block order"""
+        return self.select_operation_blocks("EPOCH_SEAL")
+
+    def delete_all_blocks(self):
+        """Remove every blockchain_log row"""
+        raise NotImplementedError
+
+    def get_checkpoint(self, name="verified"):
+        """Return the stored chain checkpoint row or None"""
+        raise NotImplementedError
+
+    def save_checkpoint(self, block_index, block_hash, name="verified"):
+        """Create or replace a chain checkpoint"""
+        raise NotImplementedError
+
+    def delete_all_checkpoints(self):
+        """Remove every chain checkpoint"""
+        raise NotImplementedError
+
+    def get_state_snapshot(self, max_block_index):
+        """Return the state snapshot with the highest block_index <= max_block_index, or None"""
+        raise NotImplementedError
+
+    def save_state_snapshot(self, block_index, block_hash, row_count, state, state_root):
+        """Create or replace the state snapshot taken after block_index; state_root is the digest of state"""
+        raise NotImplementedError
+
+    def delete_all_state_snapshots(self):
+        """Remove every state snapshot"""
+        raise NotImplementedError
+
+
+@REGISTRY.instrument("blockchain_backend_call_seconds", include_private=False, backend="supabase")
+class SupabaseBackend(StorageBackend):
+    """Backend talking to the Supabase (PostgREST) tables"""
+
+    def __init__(self, url, key):
+        self.client: Client = create_client(url, key)
+
+    def insert_grade(self, record):
+        result = self.client.table("student_grades").insert(record).execute()
+        return result.data[0] if result.data else None
+
+    def insert_grades(self, records):
+        if not records:
+            return []
+        result = self.client.table("student_grades").insert(records).execute()
+        return result.data if result.data else []
+
+    def delete_grades(self, record_ids):
+        if record_ids:
+            self.client.table("student_grades").delete().in_("id", list(record_ids)).execute()
+
+    def update_grade(self, record_id, fields):
+        self.client.table("student_grades").update(fields).eq("id", record_id).execute()
+
+    def update_grades(self, record_ids, fields):
+        if record_ids:
+            self.client.table("student_grades").update(fields).in_("id", list(record_ids)).execute()
+
+    def select_grades(self, **filters):
+        query = self.client.table("student_grades").select("*")
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        result = query.execute()
+        return result.data if result.data else []
+
+    def select_grades_by_ids(self, record_ids):
+        if not record_ids:
+            return []
+        result = self.client.table("student_grades").select("*").in_("id", list(record_ids)).order("id").execute()
+        return result.data if result.data else []
+
+    def select_grade_page(self, after_id=0, limit=1000):
+        result = (self.client.table("student_grades").select("*")
+                  .gt("id", after_id)
+                  .order("id")
+                  .limit(limit)
+                  .execute())
+        return result.data if result.data else []
+
+    def count_grades(self, **filters):
+        query = self.client.table("student_grades").select("id", count="exact", head=True)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        return query.execute().count or 0
+
+    def select_grade_grid(self, sort="id", descending=False, after=None, limit=50, **filters):
+        if sort not in GRID_SORT_COLUMNS:
+            raise ValueError(f"cannot sort grades by {sort!r}")
+        query = self.client.table("student_grades").select("*")
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        if after is not None:
+            op = "lt" if descending else "gt"
+            value = '"' + str(after[0]).replace("\\", "\\\\").replace('"', '\\"') + '"'
+            query = query.or_(f"{sort}.{op}.{value},and({sort}.eq.{value},id.{op}.{int(after[1])})")
+        result = (query.order(sort, desc=descending)
+                  .order("id", desc=descending)
+                  .limit(limit)
+                  .execute())
+        return result.data if result.data else []
+
+    def search_grades(self, term, limit=100):
+        # PostgREST turns every * in an ilike filter into %, even escaped, so the
+        # pattern is built inside the search_grades function (supabase_schema.sql)
+        result = self.client.rpc("search_grades", {"term": term, "max_rows": limit}).execute()
+        return result.data if result.data else []
+
+    def delete_all_grades(self):
+        # Supabase doesn't allow TRUNCATE
+        self.client.table("student_grades").delete().neq("id", 0).execute()
+
+    def insert_block(self, row):
+        self.insert_blocks([row])
+
+    def insert_blocks(self, rows):
+        if not rows:
+            return
+        try:
+            self.client.table("blockchain_log").insert(rows).execute()
+        except APIError as e:
+            # 23505 = unique_violation on block_index or previous_hash,
+            # 23503 = the check_block_parent trigger found no matching parent
+            if e.code in ("23505", "23503"):
+                raise BlockConflictError(str(e)) from e
+            raise
+
+    def select_blocks(self, after_index=-1, limit=1000):
+        result = (self.client.table("blockchain_log").select("*")
+                  .gt("block_index", after_index)
+                  .order("block_index")
+                  .limit(limit)
+                  .execute())
+        return result.data if result.data else []
+
+    def select_operation_blocks(self, prefix, page_size=1000):
+        # A LIKE prefix (served by the text_pattern_ops index) rather than a range, since
+        # range order under the database collation need not follow the bytes. PostgREST
+        # turns * into % even when escaped, so prefixes cannot contain it.
+        if "*" in prefix:
+            raise ValueError("operation prefixes cannot contain *")
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "*"
+        # Keyset pages on block_index: PostgREST cuts a single response off at its max-rows limit
+        rows = []
+        while True:
+            result = (self.client.table("blockchain_log").select("*")
+                      .like("sql_operation", pattern)
+                      .gt("block_index", rows[-1]["block_index"] if rows else -1)
+                      .order("block_index")
+                      .limit(page_size)
+                      .execute())
+            if not result.data:
+                return rows
+            rows.extend(result.data)
+
+    def delete_all_blocks(self):
+        self.client.table("blockchain_log").delete().neq("block_index", -1).execute()
+
+    def get_checkpoint(self, name="verified"):
+        result = self.client.table("chain_checkpoints").select("*").eq("name", name).limit(1).execute()
+        return result.data[0] if result.data else None
+
+    def save_checkpoint(self, block_index, block_hash, name="verified"):
+        self.client.table("chain_checkpoints").upsert({
+            "name": name,
+            "block_index": block_index,
+            "block_hash": block_hash,
+            "verified_at": datetime.now().isoformat()
+        }, on_conflict="name").execute()
+
+    def delete_all_checkpoints(self):
+        self.client.table("chain_checkpoints").delete().neq("name", "").execute()
+
+    def get_state_snapshot(self, max_block_index):
+        result = (self.client.table("state_snapshots").select("*")
+                  .lte("block_index", max_block_index)
+                  .order("block_index", desc=True)
+                  .limit(1)
+                  .execute())
+        return result.data[0] if result.data else None
+
+    def save_state_snapshot(self, block_index, block_hash, row_count, state, state_root):
+        self.client.table("state_snapshots").upsert({
+            "block_index": block_index,
+            "block_hash": block_hash,
+            "row_count": row_count,
+            "state": state,
+            "state_root": state_root,
+            "created_at": datetime.now().isoformat()
+        }, on_conflict="block_index").execute()
+
+    def delete_all_state_snapshots(self):
+        self.client.table("state_snapshots").delete().gte("block_index", 0).execute()
+
+
+@REGISTRY.instrument("blockchain_backend_call_seconds", include_private=False, backend="sqlite")
+class SQLiteBackend(StorageBackend):
+    """Local SQLite backend (WAL mode) with the same tables as Supabase"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS student_grades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_name TEXT NOT NULL,
+        student_id TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        grade TEXT NOT NULL,
+        semester TEXT,
+        remarks TEXT DEFAULT '',
+        is_verified INTEGER NOT NULL DEFAULT 1,
+        created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+    );
+    CREATE INDEX IF NOT EXISTS idx_grades_verified_id ON student_grades (is_verified, id);
+    CREATE INDEX IF NOT EXISTS idx_grades_student ON student_grades (student_id, is_verified);
+    CREATE INDEX IF NOT EXISTS idx_grades_grid_name ON student_grades (is_verified, student_name, id);
+    CREATE INDEX IF NOT EXISTS idx_grades_grid_subject ON student_grades (is_verified, subject, id);
+    CREATE INDEX IF NOT EXISTS idx_grades_grid_grade ON student_grades (is_verified, grade, id);
+
+    -- Trigram index backing substring search on name, student ID and subject
+    CREATE VIRTUAL TABLE IF NOT EXISTS student_grades_search USING fts5(
+        student_name, student_id, subject,
+        content='student_grades', content_rowid='id', tokenize='trigram'
+    );
+    CREATE TRIGGER IF NOT EXISTS student_grades_search_ai AFTER INSERT ON student_grades BEGIN
+        INSERT INTO student_grades_search (rowid, student_name, student_id, subject)
+        VALUES (new.id, new.student_name, new.student_id, new.subject);
+    END;
+    CREATE TRIGGER IF NOT EXISTS student_grades_search_ad AFTER DELETE ON student_grades BEGIN
+        INSERT INTO student_grades_search (student_grades_search, rowid, student_name, student_id, subject)
+        VALUES ('delete', old.id, old.student_name, old.student_id, old.subject);
+    END;
+    CREATE TRIGGER IF NOT EXISTS student_grades_search_au
+    AFTER UPDATE OF student_name, student_id, subject ON student_grades BEGIN
+        INSERT INTO student_grades_search (student_grades_search, rowid, student_name, student_id, subject)
+        VALUES ('delete', old.id, old.student_name, old.student_id, old.subject);
+        INSERT INTO student_grades_search (rowid, student_name, student_id, subject)
+        VALUES (new.id, new.student_name, new.student_id, new.subject);
+    END;
+
+    CREATE TABLE IF NOT EXISTS blockchain_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        block_index INTEGER NOT NULL UNIQUE,
+        timestamp TEXT NOT NULL,
+        data_hash TEXT NOT NULL,
+        previous_hash TEXT NOT NULL,
+        block_hash TEXT NOT NULL,
+        sql_operation TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_blocks_operation ON blockchain_log (sql_operation);
+    -- One child per block and every block on its stored parent, so concurrent writers cannot fork the chain
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_blocks_previous_hash ON blockchain_log (previous_hash);
+    CREATE TRIGGER IF NOT EXISTS check_block_parent BEFORE INSERT ON blockchain_log
+    WHEN NEW.block_index > 0 AND NOT EXISTS (
+        SELECT 1 FROM blockchain_log WHERE block_index = NEW.block_index - 1 AND block_hash = NEW.previous_hash
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'previous_hash does not match the stored block before block_index');
+    END;
+
+    CREATE TABLE IF NOT EXISTS chain_checkpoints (
+        name TEXT PRIMARY KEY,
+        block_index INTEGER NOT NULL,
+        block_hash TEXT NOT NULL,
+        verified_at TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS state_snapshots (
+        block_index INTEGER PRIMARY KEY,
+        block_hash TEXT NOT NULL,
+        row_count INTEGER NOT NULL,
+        state TEXT NOT NULL,
+        state_root TEXT,
+        created_at TEXT NOT NULL
+    );
+    """
+
+    BOOL_COLUMNS = ("is_verified",)
+
+    def __init__(self, path="blockchain.db"):
+        self.path = path
+        # One shared connection; Streamlit sessions run in separate threads
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA foreign_keys=ON")
+            has_search_index = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'student_grades_search'"
+            ).fetchone()
+            self.conn.executescript(self.SCHEMA)
+            snapshot_columns = [row[1] for row in self.conn.execute("PRAGMA table_info(state_snapshots)")]
+            if 'state_root' not in snapshot_columns:
+                # Databases created before snapshots carried a digest; those snapshots are no longer trusted
+                self.conn.execute("ALTER TABLE state_snapshots ADD COLUMN state_root TEXT")
+            if not has_search_index:
+                # Index rows written before the search table existed
+                self.conn.execute("INSERT INTO student_grades_search (student_grades_search) VALUES ('rebuild')")
+
+    def _rows(self, cursor):
+        rows = []
+        for row in cursor.fetchall():
+            item = dict(row)
+            for column in self.BOOL_COLUMNS:
+                if column in item and item[column] is not None:
+                    item[column] = bool(item[column])
+            rows.append(item)
+        return rows
+
+    def _where(self, filters):
+        if not filters:
+            return "", []
+        clauses = []
+        params = []
+        for column, value in filters.items():
+            clauses.append(f"{column} = ?")
+            params.append(int(value) if isinstance(value, bool) else value)
+        return " WHERE " + " AND ".join(clauses), params
+
+    def insert_grade(self, record):
+        columns = list(record.keys())
+        placeholders = ", ".join("?" for _ in columns)
+        with self.lock:
+            cursor = self.conn.execute(
+                f"INSERT INTO student_grades ({', '.join(columns)}) VALUES ({placeholders})",
+                [record[c] for c in columns]
+            )
+            cursor = self.conn.execute("SELECT * FROM student_grades WHERE id = ?", (cursor.lastrowid,))
+            rows = self._rows(cursor)
+        return rows[0] if rows else None
+
+    def insert_grades(self, records):
+        if not records:
+            return []
+        columns = list(records[0].keys())
+        placeholders = ", ".join("?" for _ in columns)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM student_grades")
+                first_id = cursor.fetchone()[0] + 1
+                self.conn.executemany(
+                    f"INSERT INTO student_grades ({', '.join(columns)}) VALUES ({placeholders})",
+                    [[record[c] for c in columns] for record in records]
+                )
+                cursor = self.conn.execute("SELECT * FROM student_grades WHERE id >= ? ORDER BY id", (first_id,))
+                rows = self._rows(cursor)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def delete_grades(self, record_ids):
+        record_ids = list(record_ids)
+        if not record_ids:
+            return
+        placeholders = ", ".join("?" for _ in record_ids)
+        with self.lock:
+            self.conn.execute(f"DELETE FROM student_grades WHERE id IN ({placeholders})", record_ids)
+
+    def update_grade(self, record_id, fields):
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        params = [int(v) if isinstance(v, bool) else v for v in fields.values()]
+        with self.lock:
+            self.conn.execute(f"UPDATE student_grades SET {assignments} WHERE id = ?", params + [record_id])
+
+    def update_grades(self, record_ids, fields):
+        record_ids = list(record_ids)
+        if not record_ids:
+            return
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        params = [int(v) if isinstance(v, bool) else v for v in fields.values()]
+        placeholders = ", ".join("?" for _ in record_ids)
+        with self.lock:
+            self.conn.execute(
+                f"UPDATE student_grades SET {assignments} WHERE id IN ({placeholders})",
+                params + record_ids
+            )
+
+    def select_grades(self, **filters):
+        where, params = self._where(filters)
+        with self.lock:
+            cursor = self.conn.execute(f"SELECT * FROM student_grades{where} ORDER BY id", params)
+            return self._rows(cursor)
+
+    def select_grades_by_ids(self, record_ids):
+        record_ids = list(record_ids)
+        if not record_ids:
+            return []
+        placeholders = ", ".join("?" for _ in record_ids)
+        with self.lock:
+            cursor = self.conn.execute(
+                f"SELECT * FROM student_grades WHERE id IN ({placeholders}) ORDER BY id", record_ids
+            )
+            return self._rows(cursor)
+
+    def select_grade_page(self, after_id=0, limit=1000):
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT * FROM student_grades WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, limit)
+            )
+            return self._rows(cursor)
+
+    def count_grades(self, **filters):
+        where, params = self._where(filters)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM student_grades{where}", params).fetchone()[0]
+
+    def select_grade_grid(self, sort="id", descending=False, after=None, limit=50, **filters):
+        if sort not in GRID_SORT_COLUMNS:
+            raise ValueError(f"cannot sort grades by {sort!r}")
+        where, params = self._where(filters)
+        if after is not None:
+            where += (" AND " if where else " WHERE ") + f"({sort}, id) {'<' if descending else '>'} (?, ?)"
+            params = params + list(after)
+        direction = "DESC" if descending else "ASC"
+        with self.lock:
+            cursor = self.conn.execute(
+                f"SELECT * FROM student_grades{where} ORDER BY {sort} {direction}, id {direction} LIMIT ?",
+                params + [limit]
+            )
+            return self._rows(cursor)
+
+    def search_grades(self, term, limit=100):
+        with self.lock:
+            if len(term) >= 3:
+                # Trigram phrase query == case-insensitive substring match, served by the index.
+                # Ordering by the FTS rowid (== id) lets SQLite stream matches and stop at LIMIT.
+                cursor = self.conn.execute(
+                    "SELECT g.* FROM student_grades_search s JOIN student_grades g ON g.id = s.rowid "
+                    "WHERE student_grades_search MATCH ? AND g.is_verified = 1 ORDER BY s.rowid LIMIT ?",
+                    ('"' + term.replace('"', '""') + '"', limit)
+                )
+            else:
+                # Too short for trigrams; a LIMITed scan stops at the first matches
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                conditions = " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in SEARCH_COLUMNS)
+                cursor = self.conn.execute(
+                    f"SELECT * FROM student_grades WHERE is_verified = 1 AND ({conditions}) ORDER BY id LIMIT ?",
+                    [pattern] * len(SEARCH_COLUMNS) + [limit]
+                )
+            return self._rows(cursor)
+
+    def delete_all_grades(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM student_grades")
+
+    def insert_block(self, row):
+        self.insert_blocks([row])
+
+    def insert_blocks(self, rows):
+        if not rows:
+            return
+        columns = list(rows[0].keys())
+        placeholders = ", ".join("?" for _ in columns)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    f"INSERT INTO blockchain_log ({', '.join(columns)}) VALUES ({placeholders})",
+                    [[row[c] for c in columns] for row in rows]
+                )
+                self.conn.execute("COMMIT")
+            except sqlite3.IntegrityError as e:
+                self.conn.execute("ROLLBACK")
+                if "block_index" in str(e) or "previous_hash" in str(e):
+                    raise BlockConflictError(str(e)) from e
+                raise
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def select_blocks(self, after_index=-1, limit=1000):
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT * FROM blockchain_log WHERE block_index > ? ORDER BY block_index LIMIT ?",
+                (after_index, limit)
+            )
+            return self._rows(cursor)
+
+    def select_operation_blocks(self, prefix):
+        # Byte-order prefix range (BINARY collation), so the sql_operation index is used
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT * FROM blockchain_log WHERE sql_operation >= ? AND sql_operation < ? ORDER BY block_index",
+                (prefix, upper)
+            )
+            return self._rows(cursor)
+
+    def delete_all_blocks(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM blockchain_log")
+
+    def get_checkpoint(self, name="verified"):
+        with self.lock:
+            cursor = self.conn.execute("SELECT * FROM chain_checkpoints WHERE name = ?", (name,))
+            rows = self._rows(cursor)
+        return rows[0] if rows else None
+
+    def save_checkpoint(self, block_index, block_hash, name="verified"):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO chain_checkpoints (name, block_index, block_hash, verified_at) "
+                "VALUES (?, ?, ?, ?)",
+                (name, block_index, block_hash, datetime.now().isoformat())
+            )
+
+    def delete_all_checkpoints(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM chain_checkpoints")
+
+    def get_state_snapshot(self, max_block_index):
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT * FROM state_snapshots WHERE block_index <= ? ORDER BY block_index DESC LIMIT 1",
+                (max_block_index,)
+            )
+            rows = self._rows(cursor)
+        return rows[0] if rows else None
+
+    def save_state_snapshot(self, block_index, block_hash, row_count, state, state_root):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO state_snapshots "
+                "(block_index, block_hash, row_count, state, state_root, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (block_index, block_hash, row_count, state, state_root, datetime.now().isoformat())
+            )
+
+    def delete_all_state_snapshots(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM state_snapshots")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,96 @@
+-- Supabase (Postgres) schema used by SupabaseBackend.
+-- Run in the Supabase SQL editor; every statement is idempotent.
+
+CREATE TABLE IF NOT EXISTS student_grades (
+    id BIGSERIAL PRIMARY KEY,
+    student_name TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    grade TEXT NOT NULL,
+    semester TEXT,
+    remarks TEXT DEFAULT '',
+    is_verified BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_grades_verified_id ON student_grades (is_verified, id);
+CREATE INDEX IF NOT EXISTS idx_grades_student ON student_grades (student_id, is_verified);
+-- Keyset pagination of the grade grids when sorted by name, subject or grade
+CREATE INDEX IF NOT EXISTS idx_grades_grid_name ON student_grades (is_verified, student_name, id);
+CREATE INDEX IF NOT EXISTS idx_grades_grid_subject ON student_grades (is_verified, subject, id);
+CREATE INDEX IF NOT EXISTS idx_grades_grid_grade ON student_grades (is_verified, grade, id);
+
+-- Trigram indexes so ILIKE '%term%' search does not scan the table
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_grades_name_trgm ON student_grades USING gin (student_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_grades_student_id_trgm ON student_grades USING gin (student_id gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_grades_subject_trgm ON student_grades USING gin (subject gin_trgm_ops);
+
+-- Case-insensitive substring search used by SupabaseBackend.search_grades.
+-- term is matched literally: LIKE wildcards in it are escaped here.
+CREATE OR REPLACE FUNCTION search_grades(term TEXT, max_rows INTEGER DEFAULT 100)
+RETURNS SETOF student_grades
+LANGUAGE sql STABLE AS $$
+    WITH pattern AS (
+        SELECT '%' || replace(replace(replace(term, '\', '\\'), '%', '\%'), '_', '\_') || '%' AS value
+    )
+    SELECT g.* FROM student_grades g, pattern p
+    WHERE g.is_verified
+      AND (g.student_name ILIKE p.value OR g.student_id ILIKE p.value OR g.subject ILIKE p.value)
+    ORDER BY g.id
+    LIMIT max_rows;
+$$;
+
+CREATE TABLE IF NOT EXISTS blockchain_log (
+    id BIGSERIAL PRIMARY KEY,
+    block_index BIGINT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    data_hash TEXT NOT NULL,
+    previous_hash TEXT NOT NULL,
+    block_hash TEXT NOT NULL,
+    sql_operation TEXT
+);
+-- Serves sql_operation LIKE 'prefix%' lookups (EPOCH_SEAL blocks, chunks of a bulk import)
+DROP INDEX IF EXISTS idx_blocks_operation;
+CREATE INDEX IF NOT EXISTS idx_blocks_operation_prefix ON blockchain_log (sql_operation text_pattern_ops);
+-- One child per block and every block on its stored parent, so concurrent writers cannot fork the chain
+CREATE UNIQUE INDEX IF NOT EXISTS idx_blocks_previous_hash ON blockchain_log (previous_hash);
+
+CREATE OR REPLACE FUNCTION check_block_parent() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- FOR KEY SHARE: a concurrent reset cannot delete the parent while this insert commits
+    IF NEW.block_index > 0 AND NOT EXISTS (
+        SELECT 1 FROM blockchain_log
+        WHERE block_index = NEW.block_index - 1 AND block_hash = NEW.previous_hash
+        FOR KEY SHARE
+    ) THEN
+        RAISE EXCEPTION 'previous_hash does not match the stored block before block_index %', NEW.block_index
+            USING ERRCODE = 'foreign_key_violation';
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS check_block_parent ON blockchain_log;
+CREATE TRIGGER check_block_parent BEFORE INSERT ON blockchain_log
+    FOR EACH ROW EXECUTE FUNCTION check_block_parent();
+
+-- Last verified block, so verification only re-hashes newer blocks
+CREATE TABLE IF NOT EXISTS chain_checkpoints (
+    name TEXT PRIMARY KEY,
+    block_index BIGINT NOT NULL,
+    block_hash TEXT NOT NULL,
+    verified_at TEXT NOT NULL
+);
+
+-- Compressed student_grades state as of a block, for point-in-time queries
+CREATE TABLE IF NOT EXISTS state_snapshots (
+    block_index BIGINT PRIMARY KEY,
+    block_hash TEXT NOT NULL,
+    row_count BIGINT NOT NULL,
+    state TEXT NOT NULL,
+    state_root TEXT,
+    created_at TEXT NOT NULL
+);
+-- sha256 of the state rows; snapshots without it (or not matching it) are not used
+ALTER TABLE state_snapshots ADD COLUMN IF NOT EXISTS state_root TEXT;
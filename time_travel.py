@@ -0,0 +1,58 @@
+import base64
+import json
+import zlib
+from datetime import datetime
+
+from reconcile import TRACKED_COLUMNS, block_changes
+
+# One state row per sql_id, as a list in this column order
+STATE_COLUMNS = ("id",) + TRACKED_COLUMNS
+REMARKS = STATE_COLUMNS.index("remarks")
+IS_VERIFIED = STATE_COLUMNS.index("is_verified")
+
+
+def apply_block(state, chain, pos, student_id=None):
+    """Apply one block's row changes to state (sql_id -> row list)"""
+    for change, sql_id, value in block_changes(chain, pos):
+        if change == 'INSERT':
+            if student_id is None or str(value.get('student_id')) == student_id:
+                state[sql_id] = [sql_id] + [value.get(column) for column in TRACKED_COLUMNS[:-1]] + [True]
+        elif sql_id in state:
+            row = state[sql_id]
+            row[REMARKS] = f"Deleted: {value}"
+            row[IS_VERIFIED] = False
+
+
+def student_state_at(chain, student_id, positions):
+    """State of one student's rows, replaying only the given block positions (from BlockIndex)"""
+    state = {}
+    for pos in positions:
+        apply_block(state, chain, pos, student_id)
+    return state
+
+
+def encode_state(state):
+    """Compressed text form of a state for the state_snapshots table"""
+    raw = json.dumps(list(state.values()), separators=(',', ':')).encode('utf-8')
+    return base64.b64encode(zlib.compress(raw)).decode('ascii')
+
+
+def decode_state(text):
+    rows = json.loads(zlib.decompress(base64.b64decode(text)))
+    return {row[0]: row for row in rows}
+
+
+def block_at_time(chain, when):
+    """Position of the last block stamped at or before when (a datetime), or -1.
+
+    Binary search: block timestamps are taken at append time, so they only
+    go forward along the chain.
+    """
+    low, high = 0, len(chain)
+    while low < high:
+        middle = (low + high) // 2
+        if datetime.fromisoformat(chain.timestamp_at(middle)) <= when:
+            low = middle + 1
+        else:
+            high = middle
+    return low - 1
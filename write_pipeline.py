@@ -0,0 +1,82 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class WriteOp:
+    """One pending grade insert or delete and the future its caller waits on"""
+
+    __slots__ = ('kind', 'payload', 'future')
+
+    def __init__(self, kind, payload):
+        self.kind = kind
+        self.payload = payload
+        self.future = Future()
+
+
+class WritePipeline:
+    """Background writer that group-commits grade inserts and deletes.
+
+    Callers enqueue operations and get a Future back; cancelling it before
+    the writer picks the op up keeps the op from being committed. A single writer
+    thread drains whatever is queued (up to max_group_size) and hands the
+    group to commit_group, so concurrent writers share round trips instead
+    of waiting on each other. A lone write is committed immediately; groups
+    only form while a previous commit is in flight.
+    """
+
+    def __init__(self, commit_group, max_group_size=100):
+        self.commit_group = commit_group
+        self.max_group_size = max_group_size
+        self.groups_committed = 0
+        self.ops_committed = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, kind, payload):
+        """Queue an operation and return its Future"""
+        self._ensure_started()
+        op = WriteOp(kind, payload)
+        self._queue.put(op)
+        return op.future
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="grade-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            group = [self._queue.get()]
+            while len(group) < self.max_group_size:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Skip ops whose caller gave up waiting; the rest can no longer be cancelled
+            group = [op for op in group if op.future.set_running_or_notify_cancel()]
+            if not group:
+                continue
+
+            try:
+                self.commit_group(group)
+            except Exception as e:
+                for op in group:
+                    if not op.future.done():
+                        op.future.set_exception(e)
+            self.groups_committed += 1
+            self.ops_committed += len(group)
+
+    def stats(self):
+        """Commit counters and the current queue depth"""
+        return {
+            'groups_committed': self.groups_committed,
+            'ops_committed': self.ops_committed,
+            'avg_group_size': self.ops_committed / self.groups_committed if self.groups_committed else 0.0,
+            'queued': self._queue.qsize()
+        }